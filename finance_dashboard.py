@@ -13,21 +13,9 @@ from streamlit_option_menu import option_menu
 import os
 
 # --- IMPORT UI COMPONENTS ---
-from views.dashboard_ai_news import render_ai_news_component
-from views.dashboard_macro import render_macro_economic_section
-
-# -----------------------------------------------
-# 🎯 Load ticker list from file
-def load_ticker_list(filepath="all_tickers.txt"):
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            tickers = [line.strip() for line in f if line.strip()]
-        return tickers
-    except FileNotFoundError:
-        return []
-
-ticker_list = load_ticker_list()
-# -----------------------------------------------
+# Views are imported inside the page branch that renders them, so Playwright,
+# google-genai and fredapi only load when the Dashboard page is opened.
+# Check import cost with: python -m src.import_budget
 
 # 🛠 Page config
 st.set_page_config(layout="wide", page_title="Finance Dashboard", initial_sidebar_state="collapsed")
@@ -54,6 +42,12 @@ selected = option_menu(
 )
 
 # 🔁 Helper to load page scripts safely
+@st.cache_resource
+def compile_page(full_path, mtime):
+    # Compiled once per file version; editing a page changes mtime and recompiles
+    with open(full_path, encoding="utf-8") as f:
+        return compile(f.read(), full_path, "exec")
+
 def run_script(path):
     if not path.startswith("pages"):
         full_path = os.path.join("pages", path)
@@ -61,8 +55,7 @@ def run_script(path):
         full_path = path
 
     if os.path.exists(full_path):
-        with open(full_path, encoding="utf-8") as f:
-            code = f.read()
+        code = compile_page(full_path, os.path.getmtime(full_path))
         exec(code, globals())
     else:
         st.error(f"Missing file: {full_path}")
@@ -72,6 +65,9 @@ def run_script(path):
 # ==========================================
 
 if selected == "Dashboard":
+    from views.dashboard_ai_news import render_ai_news_component
+    from views.dashboard_macro import render_macro_economic_section
+
     # This is now the ONLY line needed to show the AI News section
     render_ai_news_component()
     st.divider() # Visual separator
@@ -3,15 +3,18 @@ import pandas as pd
 import plotly.graph_objects as go
 import yfinance as yf
 from pages.single_stock.utils import (
-    get_dolthub_income_statement,
-    get_dolthub_balance_sheet_assets,
-    get_dolthub_balance_sheet_liabilities,
-    get_dolthub_balance_sheet_equity,
-    get_dolthub_cash_flow,
-    get_historical_data,
+    get_close_panel,
+    get_growth_panel,
+    get_aligned_panel,
+    get_ratio_history,
+    ticker_input,
     format_num,
     CASH_FLOW_FIELDS
 )
+from pages.single_stock.chart_utils import decimate_series, CHART_WEBGL_POINTS
+from src.figure_cache import cached_figure, fingerprint
+from src.aligned_panel import calendar_periods, period_label
+from src.ratio_engine import ratios_of_kind
 
 st.set_page_config(page_title="Comparison Mode", page_icon="⚖️", layout="wide")
 
@@ -34,7 +37,7 @@ selected_tickers = st.sidebar.multiselect(
 # but standard multiselect restricts to options. Let's add a text input for custom ones or just rely on user typing if we use a different widget. 
 # For now, standard multiselect with a predefined list + ability to add is tricky without a separate input. 
 # Let's just add a text input to add to the list.)
-new_ticker = st.sidebar.text_input("Add Ticker manually (e.g. JPM)")
+new_ticker = ticker_input("Add Ticker manually (e.g. JPM)", key="comparison_new_ticker", container=st.sidebar)
 if new_ticker:
     upper_ticker = new_ticker.upper()
     if upper_ticker not in selected_tickers:
@@ -52,26 +55,24 @@ st.subheader("📈 Price Performance Comparison")
 
 chart_period = st.selectbox("Chart Range", ["1mo", "3mo", "6mo", "1y", "2y", "5y", "max"], index=3)
 
-@st.cache_data(ttl=3600)
-def get_multi_stock_data(tickers, period):
-    data = {}
-    for t in tickers:
-        hist = get_historical_data(t, period=period)
-        if not hist.empty:
-            data[t] = hist["Close"]
-    return pd.DataFrame(data)
+# One bulk download for every uncached ticker (see get_historical_data_batch)
+price_df = get_close_panel(selected_tickers, period=chart_period)
 
-price_df = get_multi_stock_data(selected_tickers, chart_period)
-
-if not price_df.empty:
+def price_performance_figure(price_df, chart_period):
     # Normalize to % change starting at 0
     normalized_df = (price_df / price_df.iloc[0] - 1) * 100
-    
+
+    # Each line is LTTB-decimated to at most CHART_MAX_POINTS points, and
+    # many or long series are drawn with WebGL instead of SVG.
+    series = {col: decimate_series(normalized_df[col]) for col in normalized_df.columns}
+    use_webgl = sum(len(s) for s in series.values()) > CHART_WEBGL_POINTS
+    trace = go.Scattergl if use_webgl else go.Scatter
+
     fig = go.Figure()
-    for col in normalized_df.columns:
-        fig.add_trace(go.Scatter(
-            x=normalized_df.index,
-            y=normalized_df[col],
+    for col, s in series.items():
+        fig.add_trace(trace(
+            x=s.index,
+            y=s.values,
             mode='lines',
             name=col
         ))
@@ -84,6 +85,15 @@ if not price_df.empty:
         template="plotly_dark",
         height=500
     )
+    return fig
+
+if not price_df.empty:
+    # Sidebar and tab interactions rerun the page; the figure is only rebuilt
+    # when the prices or the range change.
+    fig = cached_figure(
+        ("comparison", fingerprint(price_df), chart_period, "plotly_dark"),
+        lambda: price_performance_figure(price_df, chart_period),
+    )
     st.plotly_chart(fig, use_container_width=True)
 else:
     st.info("No price data available for the selected tickers.")
@@ -94,46 +104,43 @@ st.subheader("📊 Financial Statement Comparison")
 
 tabs = st.tabs(["Income Statement", "Balance Sheet", "Cash Flow", "Key Ratios"])
 
+STATEMENT_TABLES = {
+    "income": "income_statement",
+    "balance_assets": "balance_sheet_assets",
+    "balance_liabilities": "balance_sheet_liabilities",
+    "balance_equity": "balance_sheet_equity",
+    "cash_flow": "cash_flow_statement",
+}
+
+# Fiscal period shown in the statement tabs. Filings are aligned on
+# calendar periods, so a September and a December filer are compared for
+# the same year (or quarter) instead of each one's latest report.
+period_panel = get_aligned_panel(STATEMENT_TABLES["income"], selected_tickers, statement_period)
+period_options = list(reversed(period_panel.periods)) if period_panel is not None else []
+fiscal_period = st.sidebar.selectbox(
+    "Fiscal Period",
+    period_options,
+    index=period_options.index(period_panel.latest_common_period()) if period_options else None,
+    help="Filings are matched to the calendar period their fiscal period ends nearest to.",
+)
+
 # Helper to fetch and align data
-def fetch_latest_financials(tickers, period_type, statement_type):
+def fetch_period_financials(tickers, period_type, statement_type, period):
     """
-    Fetches the latest available data for the given period type (Annual/Quarterly).
-    Returns a DataFrame where columns are Tickers and rows are Metrics.
+    Fetches one aligned period for the given period type (Annual/Quarterly).
+    Returns (DataFrame with Metrics as rows and Tickers as columns,
+    {ticker: report date}); tickers without a filing for the period are
+    left out. Every period comes from the same cached panel, so switching
+    periods does not query the database again.
     """
-    combined_data = {}
-    
-    period_filter = "YEAR" if period_type == "Annual" else "QUARTER"
-    
-    for t in tickers:
-        df = None
-        if statement_type == "income":
-            df = get_dolthub_income_statement(t)
-        elif statement_type == "balance_assets":
-            df = get_dolthub_balance_sheet_assets(t)
-        elif statement_type == "balance_liabilities":
-            df = get_dolthub_balance_sheet_liabilities(t)
-        elif statement_type == "balance_equity":
-            df = get_dolthub_balance_sheet_equity(t)
-        elif statement_type == "cash_flow":
-            df = get_dolthub_cash_flow(t)
-            
-        if isinstance(df, pd.DataFrame) and not df.empty:
-            # Filter by period
-            if "period" in df.columns:
-                df = df[df["period"].astype(str).str.upper() == period_filter]
-            
-            # Sort by date desc and take top 1 (latest)
-            # Note: This compares the *latest available* report. 
-            # Ideally we align by year/quarter, but for a quick comparison view, latest is standard.
-            if not df.empty:
-                df = df.sort_values("date", ascending=False)
-                latest = df.iloc[0]
-                combined_data[t] = latest
-    
-    if not combined_data:
-        return pd.DataFrame()
-        
-    return pd.DataFrame(combined_data)
+    panel = get_aligned_panel(STATEMENT_TABLES[statement_type], tickers, period_type)
+    if panel is None or period not in panel.periods:
+        return pd.DataFrame(), {}
+    return panel.period_frame(period), panel.report_dates(period)
+
+def report_dates_caption(report_dates):
+    if report_dates:
+        st.caption("Reports: " + ", ".join(f"{t} {d:%Y-%m-%d}" for t, d in report_dates.items()))
 
 # Helper for styling
 def style_comparison_table(df):
@@ -155,11 +162,46 @@ def style_comparison_table(df):
     
     return df.style.apply(highlight_max, axis=1).format(lambda x: format_num(x) if pd.notnull(x) else "—")
 
+GROWTH_METRICS = ["sales", "net_income", "diluted_net_eps"]
+
+
+def growth_comparison(tickers, period_type, period):
+    """
+    Growth per ticker for one aligned fiscal period, from the shared growth
+    panel: YoY and CAGR for annual reports; QoQ, YoY and trailing-twelve-month
+    totals for quarters. Rows are "<Metric> <Measure>", columns are tickers.
+    """
+    panel = get_growth_panel(STATEMENT_TABLES["income"], tickers)
+    if panel is None:
+        return None
+
+    if period_type == "Annual":
+        measures = {"YoY": panel.yoy, **{f"{years}Y CAGR": panel.cagr[years] for years in panel.cagr}}
+    else:
+        measures = {"QoQ": panel.qoq, "YoY": panel.quarterly_yoy, "TTM": panel.ttm}
+
+    rows = {}
+    for measure, frame in measures.items():
+        # Same calendar mapping as the statement and ratio tables
+        periods = calendar_periods(frame.index.get_level_values("date").to_series(), period_type)
+        in_period = [pd.notna(p) and period_label(p) == period for p in periods]
+        selected = frame[in_period].groupby(level="act_symbol").tail(1).droplevel("date")
+        for metric in GROWTH_METRICS:
+            if metric in selected.columns:
+                rows[f"{metric.replace('_', ' ').title()} {measure}"] = selected[metric]
+    if not rows:
+        return None
+    growth_df = pd.DataFrame(rows).T.reindex(columns=[t.upper() for t in tickers]).rename_axis(columns=None)
+    # Metric-major order: all Sales rows, then Net Income, ...
+    order = [f"{m.replace('_', ' ').title()} {measure}" for m in GROWTH_METRICS for measure in measures]
+    return growth_df.reindex([row for row in order if row in growth_df.index])
+
 # --- Income Statement Tab ---
 with tabs[0]:
-    st.markdown(f"### Latest {statement_period} Income Statement")
+    st.markdown(f"### {statement_period} Income Statement · {fiscal_period}")
     
-    df_income = fetch_latest_financials(selected_tickers, statement_period, "income")
+    df_income, income_dates = fetch_period_financials(selected_tickers, statement_period, "income", fiscal_period)
+    report_dates_caption(income_dates)
     
     if not df_income.empty:
         rows_to_drop = ["act_symbol", "period", "date", "cik"]
@@ -170,12 +212,26 @@ with tabs[0]:
     else:
         st.info("No income statement data found.")
 
+    st.markdown("#### Growth")
+    growth_df = growth_comparison(selected_tickers, statement_period, fiscal_period)
+    if growth_df is not None and not growth_df.empty:
+        is_value = growth_df.index.str.endswith("TTM")
+        st.dataframe(
+            style_comparison_table(growth_df)
+            .format(lambda x: f"{x:.1f}%", subset=pd.IndexSlice[~is_value, :], na_rep="—")
+            .format(lambda x: format_num(x) if pd.notnull(x) else "—", subset=pd.IndexSlice[is_value, :]),
+            use_container_width=True,
+        )
+    else:
+        st.info("Not enough history for growth figures.")
+
 # --- Balance Sheet Tab ---
 with tabs[1]:
-    st.markdown(f"### Latest {statement_period} Balance Sheet")
+    st.markdown(f"### {statement_period} Balance Sheet · {fiscal_period}")
     
     st.markdown("#### Assets")
-    df_assets = fetch_latest_financials(selected_tickers, statement_period, "balance_assets")
+    df_assets, assets_dates = fetch_period_financials(selected_tickers, statement_period, "balance_assets", fiscal_period)
+    report_dates_caption(assets_dates)
     if not df_assets.empty:
         rows_to_drop = ["act_symbol", "period", "date", "cik"]
         df_clean = df_assets.drop([r for r in rows_to_drop if r in df_assets.index], errors="ignore")
@@ -183,7 +239,7 @@ with tabs[1]:
         st.dataframe(style_comparison_table(df_clean), use_container_width=True)
         
     st.markdown("#### Liabilities")
-    df_liab = fetch_latest_financials(selected_tickers, statement_period, "balance_liabilities")
+    df_liab, _ = fetch_period_financials(selected_tickers, statement_period, "balance_liabilities", fiscal_period)
     if not df_liab.empty:
         rows_to_drop = ["act_symbol", "period", "date", "cik"]
         df_clean = df_liab.drop([r for r in rows_to_drop if r in df_liab.index], errors="ignore")
@@ -191,7 +247,7 @@ with tabs[1]:
         st.dataframe(style_comparison_table(df_clean), use_container_width=True)
 
     st.markdown("#### Equity")
-    df_eq = fetch_latest_financials(selected_tickers, statement_period, "balance_equity")
+    df_eq, _ = fetch_period_financials(selected_tickers, statement_period, "balance_equity", fiscal_period)
     if not df_eq.empty:
         rows_to_drop = ["act_symbol", "period", "date", "cik"]
         df_clean = df_eq.drop([r for r in rows_to_drop if r in df_eq.index], errors="ignore")
@@ -200,9 +256,10 @@ with tabs[1]:
 
 # --- Cash Flow Tab ---
 with tabs[2]:
-    st.markdown(f"### Latest {statement_period} Cash Flow")
+    st.markdown(f"### {statement_period} Cash Flow · {fiscal_period}")
     
-    df_cf = fetch_latest_financials(selected_tickers, statement_period, "cash_flow")
+    df_cf, cf_dates = fetch_period_financials(selected_tickers, statement_period, "cash_flow", fiscal_period)
+    report_dates_caption(cf_dates)
     
     if not df_cf.empty:
         available_fields = [f for f in CASH_FLOW_FIELDS if f in df_cf.index]
@@ -218,106 +275,24 @@ with tabs[2]:
 with tabs[3]:
     st.markdown(f"### Key Ratios ({statement_period})")
     
-    # We need to fetch all statements for each ticker to calculate ratios
-    ratios_data = {}
-    
-    for t in selected_tickers:
-        # Fetch all needed data
-        dolt_df = get_dolthub_income_statement(t)
-        assets_df = get_dolthub_balance_sheet_assets(t)
-        liab_df = get_dolthub_balance_sheet_liabilities(t)
-        equity_df = get_dolthub_balance_sheet_equity(t)
-        cash_df = get_dolthub_cash_flow(t)
-        
-        if any(df is None or df.empty for df in [dolt_df, assets_df, liab_df, equity_df]):
-            continue
-            
-        # Filter and merge latest
-        period_filter = "YEAR" if statement_period == "Annual" else "QUARTER"
-        
-        try:
-            # Helper to get latest period row
-            def get_latest(df):
-                if "period" in df.columns:
-                    df = df[df["period"].astype(str).str.upper() == period_filter]
-                return df.sort_values("date", ascending=False).iloc[0] if not df.empty else None
-
-            latest_inc = get_latest(dolt_df)
-            latest_assets = get_latest(assets_df)
-            latest_liab = get_latest(liab_df)
-            latest_eq = get_latest(equity_df)
-            latest_cf = get_latest(cash_df) if cash_df is not None else None
-            
-            if latest_inc is None or latest_assets is None or latest_liab is None or latest_eq is None:
-                continue
-                
-            # Calculate Ratios
-            # Safe get helper
-            def get_val(series, key):
-                return float(series.get(key, 0))
-                
-            net_income = get_val(latest_inc, "net_income")
-            sales = get_val(latest_inc, "sales")
-            cogs = get_val(latest_inc, "cost_of_goods")
-            total_assets = get_val(latest_assets, "total_assets")
-            total_equity = get_val(latest_eq, "total_equity")
-            total_liab = get_val(latest_liab, "total_liabilities")
-            pretax_income = get_val(latest_inc, "pretax_income")
-            interest_expense = get_val(latest_inc, "interest_expense")
-            
-            ratios = {}
-            
-            # Profitability
-            ratios["Net Profit Margin"] = (net_income / sales) if sales else 0
-            ratios["Gross Margin"] = ((sales - cogs) / sales) if sales else 0
-            ratios["ROA"] = (net_income / total_assets) if total_assets else 0
-            ratios["ROE"] = (net_income / total_equity) if total_equity else 0
-            
-            # Solvency
-            ratios["Debt to Equity"] = (total_liab / total_equity) if total_equity else 0
-            ratios["Debt Ratio"] = (total_liab / total_assets) if total_assets else 0
-            ratios["Equity Ratio"] = (total_equity / total_assets) if total_assets else 0
-            ratios["Interest Coverage"] = (pretax_income / interest_expense) if interest_expense else 0
-            
-            if latest_cf is not None:
-                ocf = get_val(latest_cf, "net_cash_from_operating_activities")
-                curr_liab = get_val(latest_liab, "current_liabilities")
-                ratios["Operating Cash Flow Ratio"] = (ocf / curr_liab) if curr_liab else 0
-            
-            ratios_data[t] = ratios
-            
-        except Exception as e:
-            # st.error(f"Error calculating ratios for {t}: {e}")
-            continue
-
-    if ratios_data:
-        df_ratios = pd.DataFrame(ratios_data)
-        
-        # Format Ratios
-        percent_rows = ["Net Profit Margin", "Gross Margin", "ROA", "ROE", "Debt Ratio", "Equity Ratio"]
-        
-        def format_ratio_val(val, row_name):
-            if row_name in percent_rows:
-                return f"{val * 100:.2f}%"
-            return f"{val:.2f}"
-            
-        # Apply formatting
-        # We can't easily apply different formats to different rows in a standard dataframe display without style
-        # So we'll convert to string for display or use style
-        
-        st.dataframe(df_ratios.style.format(lambda x: f"{x:.2f}"), use_container_width=True)
-        
-        # Better styling: Highlight best/worst?
-        # For margins/returns, higher is green. For debt, lower is often better (but depends).
-        # Let's just stick to a simple heatmap style for now.
-        
-        st.caption("Green indicates higher values, Red indicates lower values (relative to row).")
-        
-        def highlight_max(s):
-            is_max = s == s.max()
-            return ['background-color: #2E7D32' if v else '' for v in is_max]
-            
-        # st.dataframe(df_ratios.style.apply(highlight_max, axis=1), use_container_width=True)
-        
+    # The same registry-driven ratios as the single-stock Key Ratios view,
+    # for all tickers from one query, for the selected fiscal period.
+    # Zero or missing denominators show as "—" instead of 0.
+    ratio_history = get_ratio_history(selected_tickers, statement_period)
+
+    if ratio_history is not None and not ratio_history.empty:
+        periods = calendar_periods(ratio_history.index.get_level_values("date").to_series(), statement_period)
+        in_period = [pd.notna(p) and period_label(p) == fiscal_period for p in periods]
+        latest = ratio_history[in_period].groupby(level="act_symbol").tail(1).droplevel("date")
+        df_ratios = latest.T.reindex(columns=[t.upper() for t in selected_tickers]).rename_axis(columns=None)
+        df_ratios = df_ratios.dropna(axis=1, how="all")
+
+        is_percent = df_ratios.index.isin(ratios_of_kind("percent"))
+        st.dataframe(
+            df_ratios.style
+            .format(lambda x: f"{x * 100:.2f}%", subset=pd.IndexSlice[is_percent, :], na_rep="—")
+            .format("{:.2f}", subset=pd.IndexSlice[~is_percent, :], na_rep="—"),
+            use_container_width=True,
+        )
     else:
         st.info("Could not calculate ratios for selected tickers.")
@@ -0,0 +1,108 @@
+# pages/single_stock/chart_utils.py
+import os
+
+import numpy as np
+
+# -----------------------------
+# OHLC Resampling
+# -----------------------------
+# Streamlit cannot report the browser's chart width to the script, so the
+# candle budget assumes a ~1200px wide chart at ~3px per candle. Raise it for
+# wide screens with CHART_MAX_CANDLES.
+CHART_MAX_CANDLES = int(os.getenv("CHART_MAX_CANDLES", "400"))
+
+# (label, pandas rule, approx. days per bar), finest first
+BAR_SIZES = [
+    ("Daily", None, 1),
+    ("Weekly", "W-MON", 7),
+    ("Monthly", "MS", 30.4),
+]
+
+OHLC_AGG = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+}
+
+
+def choose_bar_size(index, max_bars=CHART_MAX_CANDLES):
+    """
+    Finest bar size that keeps the number of candles within `max_bars`,
+    based on the calendar span of a DatetimeIndex. Returns (label, rule).
+    """
+    if len(index) <= max_bars:
+        return BAR_SIZES[0][:2]
+    span_days = (index[-1] - index[0]).days + 1
+    for label, rule, days in BAR_SIZES[1:]:
+        if span_days / days <= max_bars:
+            return label, rule
+    return BAR_SIZES[-1][:2]
+
+
+def resample_ohlc(hist, rule):
+    """Aggregates daily OHLCV bars into `rule` bars (labelled by bar start)."""
+    if rule is None or hist.empty:
+        return hist
+    agg = {col: how for col, how in OHLC_AGG.items() if col in hist.columns}
+    bars = hist.resample(rule, closed="left", label="left").agg(agg)
+    return bars.dropna(subset=["Close"])
+
+
+def downsample_ohlc(hist, max_bars=CHART_MAX_CANDLES):
+    """Returns (bars, label): `hist` at the finest bar size that fits `max_bars`."""
+    label, rule = choose_bar_size(hist.index, max_bars)
+    return resample_ohlc(hist, rule), label
+
+
+# -----------------------------
+# Line Decimation
+# -----------------------------
+# Points per line series sent to the browser, and the total point count above
+# which line charts switch to WebGL (go.Scattergl) traces.
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "1000"))
+CHART_WEBGL_POINTS = int(os.getenv("CHART_WEBGL_POINTS", "5000"))
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: positions of the `n_out` points of (x, y)
+    that best preserve the shape of the line. The first and last points are
+    always kept. Each bucket picks the point forming the largest triangle
+    with the previous pick and the mean of the next bucket; the area of all
+    candidates in a bucket is computed at once with NumPy.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    # Mean of every bucket up front; the last bucket's "next" is the last point
+    sums_x, sums_y = np.add.reduceat(x[:n - 1], starts), np.add.reduceat(y[:n - 1], starts)
+    counts = ends - starts
+    means_x = np.append(sums_x / counts, x[-1])
+    means_y = np.append(sums_y / counts, y[-1])
+
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    prev = 0
+    for b, (start, end) in enumerate(zip(starts, ends)):
+        ax, ay = x[prev], y[prev]
+        cx, cy = means_x[b + 1], means_y[b + 1]
+        bx, by = x[start:end], y[start:end]
+        areas = np.abs((ax - cx) * (by - ay) - (ax - bx) * (cy - ay))
+        prev = start + int(np.argmax(areas))
+        picks[b + 1] = prev
+    return picks
+
+
+def decimate_series(series, max_points=CHART_MAX_POINTS):
+    """LTTB-decimates a datetime-indexed Series (NaNs dropped) to `max_points`."""
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    x = series.index.asi8.astype(np.float64)
+    y = series.to_numpy(dtype=np.float64)
+    return series.iloc[lttb_indices(x, y, max_points)]
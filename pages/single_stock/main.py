@@ -3,15 +3,12 @@
 import streamlit as st
 import pandas as pd
 
-from pages.single_stock.single_stock_overview import display_overview, get_yf_data
+from pages.single_stock.single_stock_overview import display_overview
 from pages.single_stock.single_stock_fundamentals import display_fundamentals
 from pages.single_stock.single_stock_charts import display_charts
 from pages.single_stock.utils import (
-    get_dolthub_income_statement,
-    get_dolthub_balance_sheet_assets,
-    get_dolthub_balance_sheet_liabilities,
-    get_dolthub_balance_sheet_equity,
-    get_dolthub_cash_flow,
+    load_ticker_bundle,
+    ticker_input,
 )
 
 # -----------------------------
@@ -35,14 +32,19 @@ div[data-testid="column"] {
 # -----------------------------
 # Ticker Input
 # -----------------------------
-ticker = st.text_input("Enter a stock ticker (e.g., AAPL, MSFT, or 2330.TW):").strip().upper()
+ticker = ticker_input("Enter a stock ticker (e.g., AAPL, MSFT, or 2330.TW):", key="single_stock_ticker")
 
 # -----------------------------
 # Display Logic
 # -----------------------------
 if ticker:
+    # -------- Load every source in parallel --------
+    # The period selector is rendered further down; its last value is
+    # already in session state, so the right tables can be fetched up front.
+    bundle = load_ticker_bundle(ticker, st.session_state.get("statement_period"))
+
     # -------- DoltHub Income Statement (Primary Source) --------
-    dolt_df_raw = get_dolthub_income_statement(ticker)
+    dolt_df_raw = bundle["income"]
 
     if isinstance(dolt_df_raw, str) and dolt_df_raw.startswith("ERROR::"):
         st.warning(f"DoltHub error: {dolt_df_raw}")
@@ -53,7 +55,7 @@ if ticker:
     using_dolthub = not dolt_df.empty
 
     # -------- Yahoo Finance Fallback --------
-    yf_df, _ = get_yf_data(ticker)
+    yf_df, _ = bundle["yf"]
 
     # -------- Overview Section --------
     with st.expander("Overview", expanded=True):
@@ -76,6 +78,7 @@ if ticker:
         statement_period = st.segmented_control(
             "",
             options=["Annual", "Quarterly"],
+            key="statement_period",
         )
 
         # Prepare balance sheet tables
@@ -84,9 +87,11 @@ if ticker:
         equity_df = None
 
         if using_dolthub:
-            assets_df = get_dolthub_balance_sheet_assets(ticker)
-            liabilities_df = get_dolthub_balance_sheet_liabilities(ticker)
-            equity_df = get_dolthub_balance_sheet_equity(ticker)
+            # Only the selected period was loaded; the filter runs in the query
+            assets_df, liabilities_df, equity_df = (
+                bundle[key] if isinstance(bundle[key], pd.DataFrame) else pd.DataFrame()
+                for key in ("assets", "liabilities", "equity")
+            )
 
             if assets_df.empty and liabilities_df.empty and equity_df.empty:
                 st.warning("📭 No DoltHub financials found. Falling back to Yahoo Finance.")
@@ -95,6 +100,9 @@ if ticker:
                 liabilities_df = None
                 equity_df = None
 
+        # Cash flow was loaded with the bundle (all periods; the tab filters)
+        cash_flow_df = bundle["cash_flow"] if isinstance(bundle["cash_flow"], pd.DataFrame) else pd.DataFrame()
+
         # -------- Unified Fundamentals Rendering --------
         display_fundamentals(
             statement_tab=statement_tab,
@@ -103,7 +111,7 @@ if ticker:
             assets_df=assets_df if using_dolthub else None,
             liabilities_df=liabilities_df if using_dolthub else None,
             equity_df=equity_df if using_dolthub else None,
-            get_dolthub_cash_flow=get_dolthub_cash_flow if using_dolthub else None,
+            cash_flow_df=cash_flow_df if using_dolthub else None,
             ticker=ticker,
             yf_df=None if using_dolthub else yf_df,
         )
@@ -2,7 +2,130 @@
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
-from pages.single_stock.utils import get_historical_data
+from plotly.subplots import make_subplots
+from pages.single_stock.utils import get_historical_data, get_indicator
+from pages.single_stock.chart_utils import downsample_ohlc
+from src.figure_cache import cached_figure, fingerprint
+from src.indicators import INDICATORS, volume_profile
+from src.period_cube import get_period_cube
+
+# -----------------------------
+# Figure Builders
+# -----------------------------
+# Indicator choices for the price chart: label -> (src.indicators name, params).
+# Overlays share the price axis; the others get their own panel below it.
+INDICATOR_OPTIONS = {
+    "SMA 20": ("SMA", {"window": 20}),
+    "SMA 50": ("SMA", {"window": 50}),
+    "SMA 200": ("SMA", {"window": 200}),
+    "EMA 20": ("EMA", {"span": 20}),
+    "Bollinger Bands": ("Bollinger Bands", {}),
+    "VWAP (20)": ("VWAP", {}),
+    "RSI (14)": ("RSI", {}),
+    "MACD": ("MACD", {}),
+    "ATR (14)": ("ATR", {}),
+}
+VOLUME_PROFILE = "Volume Profile"
+
+def _price_figure(bars, chart_type, overlays=None, panels=None, profile=None):
+    overlays, panels = overlays or {}, panels or {}
+    rows = 1 + len(panels)
+    fig = make_subplots(
+        rows=rows,
+        cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        row_heights=[0.6] + [0.4 / len(panels)] * len(panels) if panels else None,
+    )
+
+    if chart_type == "Line":
+        fig.add_trace(go.Scatter(x=bars.index, y=bars["Close"], mode="lines", name="Close"), row=1, col=1)
+    else:
+        fig.add_trace(go.Candlestick(
+            x=bars.index,
+            open=bars["Open"],
+            high=bars["High"],
+            low=bars["Low"],
+            close=bars["Close"],
+            name="Candlestick"
+        ), row=1, col=1)
+
+    for label, values in overlays.items():
+        for col in values.columns:
+            name = label if len(values.columns) == 1 else f"{label} {col}"
+            line = dict(width=1, dash="dot" if col in ("Upper", "Lower") else None)
+            fig.add_trace(go.Scatter(x=values.index, y=values[col], mode="lines", name=name, line=line), row=1, col=1)
+
+    for row, (label, values) in enumerate(panels.items(), start=2):
+        for col in values.columns:
+            if col == "Histogram":
+                fig.add_trace(go.Bar(x=values.index, y=values[col], name=f"{label} {col}", opacity=0.5), row=row, col=1)
+            else:
+                fig.add_trace(go.Scatter(x=values.index, y=values[col], mode="lines", name=col, line=dict(width=1)), row=row, col=1)
+        if "RSI" in values.columns:
+            for level in (30, 70):
+                fig.add_hline(y=level, line=dict(width=1, dash="dot", color="#888"), row=row, col=1)
+        fig.update_yaxes(title_text=label, row=row, col=1)
+
+    if profile is not None and not profile.empty:
+        # Horizontal volume bars along the right edge of the price panel
+        fig.add_trace(go.Bar(
+            x=profile["Volume"],
+            y=profile["Price"],
+            orientation="h",
+            name=VOLUME_PROFILE,
+            opacity=0.3,
+            xaxis="x99",
+            yaxis="y",
+        ))
+        fig.update_layout(xaxis99=dict(
+            overlaying="x",
+            side="top",
+            range=[profile["Volume"].max() * 4, 0],
+            showticklabels=False,
+            showgrid=False,
+        ))
+
+    fig.update_xaxes(rangeslider_visible=False)
+    fig.update_layout(
+        xaxis_title="Date" if not panels else None,
+        yaxis_title="Price",
+        showlegend=bool(overlays or panels),
+        margin=dict(l=40, r=40, t=30, b=40),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(color="#fff"),
+        height=450 + 170 * len(panels),
+    )
+    return fig
+
+def _metric_figure(periods, values, scale, suffix, selected_label, currency):
+    formatted_values = [f"{v/scale:,.2f}" for v in values]
+    max_val_actual = max(values)
+    min_val_actual = min(values)
+    colors = [
+        "#6FCF97" if v == max_val_actual else "#D87C6E" if v == min_val_actual else "cornflowerblue"
+        for v in values
+    ]
+
+    fig = go.Figure(go.Bar(
+        x=periods,
+        y=values,
+        text=formatted_values,
+        textposition="outside",
+        marker=dict(color=colors)
+    ))
+
+    fig.update_layout(
+        title=selected_label,
+        xaxis_title="Period",
+        yaxis_title=f"{selected_label} ({currency}, {suffix})",
+        margin=dict(l=40, r=40, t=60, b=40),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(color="#fff")
+    )
+    return fig
 
 def display_charts(ticker, yf_df, dolt_df, using_dolthub):
     # -----------------------------
@@ -60,30 +183,59 @@ def display_charts(ticker, yf_df, dolt_df, using_dolthub):
     hist = get_historical_data(ticker, period=time_range)
 
     if not hist.empty:
-        fig = go.Figure()
-
+        # Bars actually drawn; indicators and the volume profile follow it
+        window = hist
         if chart_type == "Line":
-            fig.add_trace(go.Scatter(x=hist.index, y=hist["Close"], mode="lines", name="Close"))
+            plot_data = hist[["Close"]]
         else:
-            fig.add_trace(go.Candlestick(
-                x=hist.index,
-                open=hist["Open"],
-                high=hist["High"],
-                low=hist["Low"],
-                close=hist["Close"],
-                name="Candlestick"
-            ))
-
-        fig.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Price",
-            showlegend=False,
-            margin=dict(l=40, r=40, t=30, b=40),
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            font=dict(color="#fff")
+            # Long ranges are drawn as weekly/monthly candles; the zoom slider
+            # re-resolves the selected window at finer detail.
+            plot_data, bar_size = downsample_ohlc(hist)
+            if bar_size != "Daily":
+                first, last = hist.index[0].date(), hist.index[-1].date()
+                zoom_start, zoom_end = st.slider(
+                    "Zoom",
+                    min_value=first,
+                    max_value=last,
+                    value=(first, last),
+                    format="YYYY-MM-DD",
+                    key=f"price_zoom_{ticker}_{time_range}",
+                )
+                dates = hist.index.date
+                window = hist[(dates >= zoom_start) & (dates <= zoom_end)]
+                plot_data, bar_size = downsample_ohlc(window)
+                if bar_size != "Daily":
+                    st.caption(f"Showing {bar_size.lower()} candles — narrow the zoom range for more detail.")
+
+        selected = st.multiselect(
+            "Indicators",
+            list(INDICATOR_OPTIONS) + [VOLUME_PROFILE],
+            key="price_indicators",
         )
+        overlays, panels = {}, {}
+        for label in selected:
+            if label == VOLUME_PROFILE:
+                continue
+            name, params = INDICATOR_OPTIONS[label]
+            values = get_indicator(ticker, name, period=time_range, **params)
+            if not window.empty:
+                values = values.loc[(values.index >= window.index[0]) & (values.index <= window.index[-1])]
+            target = overlays if INDICATORS[name].overlay else panels
+            target[label] = values
+        profile = volume_profile(window) if VOLUME_PROFILE in selected else None
 
+        # Rebuilt only when the bars, indicators, chart type or range change
+        fig = cached_figure(
+            (
+                "price",
+                fingerprint(plot_data, profile, *overlays.values(), *panels.values()),
+                chart_type,
+                time_range,
+                tuple(selected),
+                "dark",
+            ),
+            lambda: _price_figure(plot_data, chart_type, overlays, panels, profile),
+        )
         st.plotly_chart(fig, use_container_width=True)
 
     # -----------------------------
@@ -147,18 +299,22 @@ def display_charts(ticker, yf_df, dolt_df, using_dolthub):
         selected_label = st.selectbox("Choose a Metric to Visualize:", available_metrics, key="metric_select")
         selected_col = metrics_map[selected_label]
 
-        df_metric = df_plot.copy()
-        if using_dolthub and "period" in df_metric.columns:
-            df_metric["period"] = df_metric["period"].astype(str).str.upper()
-            period_key = "YEAR" if statement_period == "Annual" else "QUARTER"
-            df_metric = df_metric[df_metric["period"] == period_key]
-
-        df_metric["Period"] = df_metric["date"].dt.to_period("Q" if statement_period == "Quarterly" else "Y").astype(str)
-        grouped = df_metric.groupby("Period")[selected_col].sum().dropna().reset_index()
+        # Every metric for both frequencies is aggregated once per ticker;
+        # switching metric or frequency only reads a column of the cube.
+        metric_cols = tuple(metrics_map[label] for label in available_metrics)
+        period_col = "period" if using_dolthub and "period" in df_plot.columns else None
+        key_cols = ["date", period_col, *metric_cols] if period_col else ["date", *metric_cols]
+        cube = get_period_cube(
+            ticker.upper(),
+            fingerprint(df_plot[key_cols]),
+            df_plot,
+            metric_cols,
+            period_col=period_col,
+        )
+        periods, values = cube.series(statement_period, selected_col)
+        grouped = pd.DataFrame({"Period": periods, selected_col: values})
 
         if not grouped.empty:
-            values = grouped[selected_col].astype(float).tolist()
-            periods = grouped["Period"].tolist()
             max_val = max(abs(v) for v in values)
             scale, suffix = 1, ""
             if max_val >= 1e12:
@@ -170,30 +326,9 @@ def display_charts(ticker, yf_df, dolt_df, using_dolthub):
             elif max_val >= 1e3:
                 scale, suffix = 1e3, "K"
 
-            formatted_values = [f"{v/scale:,.2f}" for v in values]
-            max_val_actual = max(values)
-            min_val_actual = min(values)
-            colors = [
-                "#6FCF97" if v == max_val_actual else "#D87C6E" if v == min_val_actual else "cornflowerblue"
-                for v in values
-            ]
-
-            fig = go.Figure(go.Bar(
-                x=periods,
-                y=values,
-                text=formatted_values,
-                textposition="outside",
-                marker=dict(color=colors)
-            ))
-
-            fig.update_layout(
-                title=selected_label,
-                xaxis_title="Period",
-                yaxis_title=f"{selected_label} ({currency}, {suffix})",
-                margin=dict(l=40, r=40, t=60, b=40),
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                font=dict(color="#fff")
+            fig = cached_figure(
+                ("metric", fingerprint(grouped), selected_label, currency, "dark"),
+                lambda: _metric_figure(periods, values, scale, suffix, selected_label, currency),
             )
 
             st.caption(f"Chart values shown in **{suffix}** ({currency}) — e.g., 1.25{suffix} = {int(scale):,} {currency}")
@@ -1,215 +1,78 @@
 import streamlit as st
 import pandas as pd
 from .utils import (
-    get_dolthub_cash_flow,
     get_dolthub_income_statement,
     get_dolthub_balance_sheet_assets,
-    get_dolthub_cash_flow,
+    get_ratio_history,
     format_num,
     render_card,
     style_growth_from_prev,
     style_yoy_percent,
     CASH_FLOW_FIELDS,
 )
+from .statement_table import get_statement_table, period_labels, render_statement_table
+from src.figure_cache import fingerprint
+from src.growth_analytics import cached_growth_panel
+from src.ratio_engine import ratios_of_kind
 
 # Optional: If you need get_dolthub_cash_flow or other shared utilities
 # from .utils import get_dolthub_cash_flow
-def render_income_statement_values(dolt_df, statement_period, style_growth_from_prev):
+def render_income_statement_values(dolt_df, statement_period, style_growth_from_prev, ticker=None):
     label = "Income Statement"
 
     if dolt_df is None or dolt_df.empty:
         st.info("No income statement data found.")
         return
 
-    df = dolt_df.copy()
-    df["period"] = df["period"].astype(str).str.upper()
-    period_value = "YEAR" if statement_period == "Annual" else "QUARTER"
-    filtered_df = df[df["period"] == period_value].copy()
-
-    if filtered_df.empty:
+    table = get_statement_table(ticker or "", "income", statement_period, dolt_df, label)
+    if table is None:
         st.info(f"No {statement_period.lower()} income statement data available.")
         return
 
-    # Format numeric columns
-    for col in filtered_df.select_dtypes(include=["float", "int"]).columns:
-        filtered_df[col] = filtered_df[col].apply(
-            lambda x: f"{x:,.0f}" if pd.notnull(x) else "—"
-        )
-
-    ordered_cols = ["date"] + [c for c in filtered_df.columns if c != "date"]
-    df_clean = filtered_df[ordered_cols].copy()
-
-    df_clean["date"] = pd.to_datetime(df_clean["date"], errors="coerce")
-    df_clean = df_clean.sort_values("date")
-
-    df_transposed = (
-        df_clean.set_index("date")
-                .T
-                .reset_index()
-                .rename(columns={"index": label})
-    )
-
-    df_transposed = df_transposed[~df_transposed[label].isin(["act_symbol", "period"])]
-    df_transposed[label] = df_transposed[label].str.replace("_", " ").str.title()
-
-    # Format column headers (Years, Quarters)
-    formatted_cols = []
-    for col in df_transposed.columns:
-        if isinstance(col, pd.Timestamp):
-            if statement_period == "Annual":
-                formatted_cols.append(col.strftime("%Y"))
-            else:
-                q = (col.month - 1) // 3 + 1
-                formatted_cols.append(f"{col.year} Q{q}")
-        else:
-            formatted_cols.append(col)
-    df_transposed.columns = formatted_cols
-
-    # Scaling logic
-    def try_parse(x):
-        try:
-            return float(str(x).replace(",", ""))
-        except:
-            return None
-
-    numeric_values = []
-    for col in df_transposed.columns:
-        if col != label:
-            numeric_values.extend(
-                [try_parse(x) for x in df_transposed[col] if try_parse(x) is not None]
-            )
-
-    max_abs_val = max(abs(v) for v in numeric_values) if numeric_values else 1
-
-    if max_abs_val >= 1e12:
-        scale, suffix = 1e12, "T"
-    elif max_abs_val >= 1e9:
-        scale, suffix = 1e9, "B"
-    elif max_abs_val >= 1e6:
-        scale, suffix = 1e6, "M"
-    elif max_abs_val >= 1e3:
-        scale, suffix = 1e3, "K"
-    else:
-        scale, suffix = 1, ""
-
-    def format_scaled(x):
-        val = try_parse(x)
-        return f"{val / scale:,.2f}" if val is not None else "—"
-
-    for col in df_transposed.columns:
-        if col != label:
-            df_transposed[col] = df_transposed[col].apply(format_scaled)
+    render_statement_table(table, style_growth_from_prev)
 
-    st.caption(f"All values shown in **{suffix}**")
 
-    styled_df = style_growth_from_prev(df_transposed, label)
-    st.dataframe(styled_df, use_container_width=True, hide_index=True)
-
-
-def compute_yoy_table(df, label_name, statement_period):
+def compute_yoy_table(df, label_name, statement_period, flow=True):
     """
-    Computes YoY % change table based on date, for Income, Balance Sheet, Cash Flow.
-    - Filters by period (YEAR / QUARTER) if 'period' column exists
+    Computes the % change table for Income, Balance Sheet, Cash Flow from the
+    shared growth panel (src.growth_analytics):
+    - Annual: each year vs the previous year
+    - Quarterly: each quarter vs the previous quarter (for flow statements a
+      Q4 only filed in the annual report is derived, so Q1 has a base)
     - Returns a transposed table with human-readable column labels (YYYY or YYYY Qx)
-    - Output is ready to pass into style_yoy_percent(...)
+    - Output holds numeric % values, ready to pass into style_yoy_percent(...)
     """
-    if df is None or df.empty:
-        return None
-
-    df = df.copy()
-
-    # Must have a date column
-    if "date" not in df.columns:
+    if df is None or df.empty or "date" not in df.columns:
         return None
 
-    # Normalize date
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    # If period exists, filter by Annual / Quarterly
-    if "period" in df.columns:
-        df["period"] = df["period"].astype(str).str.upper()
-        period_filter = "YEAR" if statement_period == "Annual" else "QUARTER"
-        df = df[df["period"] == period_filter]
-
-    # Drop rows with no date and sort
-    df = df.dropna(subset=["date"]).sort_values("date")
-
-    # Need at least 2 periods to compute change
-    if df["date"].nunique() < 2:
-        return None
-
-    # Keep only numeric value columns (exclude metadata)
-    numeric_cols = []
-    for c in df.columns:
-        if c in ["date", "act_symbol", "period"]:
-            continue
-        if pd.api.types.is_numeric_dtype(df[c]):
-            numeric_cols.append(c)
-
+    # Growth panels are keyed by ticker and period type; single-statement
+    # frames without them belong to one ticker and the selected period
+    stored = "YEAR" if statement_period == "Annual" else "QUARTER"
+    if "act_symbol" not in df.columns:
+        df = df.assign(act_symbol="")
+    if "period" not in df.columns:
+        df = df.assign(period=stored)
+
+    numeric_cols = tuple(
+        c for c in df.columns
+        if c not in ("date", "act_symbol", "period") and pd.api.types.is_numeric_dtype(df[c])
+    )
     if not numeric_cols:
         return None
 
-    # Wide format: index = date, columns = metrics
-    wide = (
-        df[["date"] + numeric_cols]
-        .drop_duplicates(subset="date")
-        .set_index("date")
-    )
-
-    # YoY % change by date
-    yoy = wide.pct_change() * 100
-    yoy = yoy.iloc[1:]  # drop the first NaN row
+    panel = cached_growth_panel(label_name, fingerprint(df), df, numeric_cols, flow)
+    if statement_period == "Annual":
+        growth = panel.yoy
+    else:
+        growth = panel.qoq[~panel.derived_q4.to_numpy()]
 
-    if yoy.empty:
+    # One ticker per statement frame; the first period has no base
+    growth = growth.droplevel("act_symbol").iloc[1:]
+    if growth.empty:
         return None
 
-    # Transpose for display: rows = metrics, columns = dates
-    yoy_t = yoy.T.reset_index()
-    yoy_t = yoy_t.rename(columns={"index": label_name})
-
-    # Build readable period labels from the date index
-    # yoy.index is a DatetimeIndex of the dates we used
-    dates = list(yoy.index)
-
-    pretty = []
-    for d in dates:
-        if isinstance(d, pd.Timestamp):
-            if statement_period == "Annual":
-                pretty.append(d.strftime("%Y"))
-            else:
-                q = (d.month - 1) // 3 + 1
-                pretty.append(f"{d.year} Q{q}")
-        else:
-            pretty.append(str(d))
-
-    # Ensure unique column names (required for Styler)
-    final_cols = [label_name]
-    seen = {}
-    for col in pretty:
-        if col in seen:
-            seen[col] += 1
-            final_cols.append(f"{col}_{seen[col]}")
-        else:
-            seen[col] = 1
-            final_cols.append(col)
-
-    # Now length matches exactly: 1 label + len(dates)
-    yoy_t.columns = final_cols
-
-    # Format as percentages
-    for c in yoy_t.columns[1:]:
-        yoy_t[c] = yoy_t[c].apply(
-            lambda x: f"{x:.2f}%" if pd.notnull(x) else "—"
-        )
-
-    # --- Clean metric names to match value tables ---
-    yoy_t[label_name] = (
-        yoy_t[label_name]
-        .astype(str)
-        .str.replace("_", " ")
-        .str.title()
-    )
-
+    yoy_t = pd.DataFrame(growth.to_numpy().T, columns=period_labels(growth.index.to_series(), statement_period))
+    yoy_t.insert(0, label_name, [c.replace("_", " ").title() for c in growth.columns])
     return yoy_t
 
 
@@ -221,7 +84,7 @@ def display_fundamentals(
     assets_df=None,
     liabilities_df=None,
     equity_df=None,
-    get_dolthub_cash_flow=None,
+    cash_flow_df=None,
     ticker=None,
     yf_df=None  # 👈 Add this
 ):
@@ -229,16 +92,9 @@ def display_fundamentals(
     import pandas as pd
 
     # ---- 🔥 ALWAYS initialize cash_flow_df here ----
-    cash_flow_df = pd.DataFrame()
-
-    # Load from DoltHub once (so it is available for ALL tabs)
-    if get_dolthub_cash_flow is not None and ticker:
-        try:
-            cf = get_dolthub_cash_flow(ticker)
-            if isinstance(cf, pd.DataFrame):
-                cash_flow_df = cf
-        except Exception as e:
-            st.warning(f"Error loading DoltHub cash flow: {e}")
+    # (loaded by the caller with every period; the Cash Flow tab filters)
+    if not isinstance(cash_flow_df, pd.DataFrame):
+        cash_flow_df = pd.DataFrame()
 
     if dolt_df is not None:
         # Original DoltHub logic
@@ -264,7 +120,7 @@ def display_fundamentals(
         if not yoy_toggle:
             # Default values table
             render_income_statement_values(
-                dolt_df, statement_period, style_growth_from_prev
+                dolt_df, statement_period, style_growth_from_prev, ticker=ticker
             )
 
         else:
@@ -298,6 +154,7 @@ def display_fundamentals(
             df["period"] = df["period"].astype(str).str.upper()
 
             period_value = "YEAR" if statement_period == "Annual" else "QUARTER"
+            full_df = df
             df = df[df["period"] == period_value]
 
             if df.empty:
@@ -314,68 +171,8 @@ def display_fundamentals(
                 # -------------------------
                 # VALUES MODE (default)
                 # -------------------------
-                df_transposed = (
-                    df_clean.set_index("date")
-                            .T
-                            .reset_index()
-                            .rename(columns={"index": label})
-                )
-
-                # Clean names
-                df_transposed[label] = df_transposed[label].str.replace("_", " ").str.title()
-
-                # Format columns as years / quarters
-                formatted_cols = []
-                for col in df_transposed.columns:
-                    if isinstance(col, pd.Timestamp):
-                        if statement_period == "Annual":
-                            formatted_cols.append(col.strftime("%Y"))
-                        else:
-                            q = (col.month - 1) // 3 + 1
-                            formatted_cols.append(f"{col.year} Q{q}")
-                    else:
-                        formatted_cols.append(col)
-                df_transposed.columns = formatted_cols
-
-                # Determine scale
-                def try_parse(x):
-                    try:
-                        return float(str(x).replace(",", ""))
-                    except:
-                        return None
-
-                numeric_values = [
-                    try_parse(x)
-                    for col in df_transposed.columns if col != label
-                    for x in df_transposed[col]
-                    if try_parse(x) is not None
-                ]
-
-                max_abs_val = max(abs(v) for v in numeric_values) if numeric_values else 1
-
-                if max_abs_val >= 1e12:
-                    scale, suffix = 1e12, "T"
-                elif max_abs_val >= 1e9:
-                    scale, suffix = 1e9, "B"
-                elif max_abs_val >= 1e6:
-                    scale, suffix = 1e6, "M"
-                elif max_abs_val >= 1e3:
-                    scale, suffix = 1e3, "K"
-                else:
-                    scale, suffix = 1, ""
-
-                def format_scaled(x):
-                    val = try_parse(x)
-                    return f"{val / scale:,.2f}" if val is not None else "—"
-
-                for col in df_transposed.columns:
-                    if col != label:
-                        df_transposed[col] = df_transposed[col].apply(format_scaled)
-
-                st.caption(f"All values shown in **{suffix}**")
-
-                styled = style_growth_from_prev(df_transposed, label)
-                st.dataframe(styled, use_container_width=True, hide_index=True)
+                table = get_statement_table(ticker or "", label, statement_period, df_clean, label)
+                render_statement_table(table, style_growth_from_prev)
                 return
 
             # -------------------------
@@ -384,7 +181,8 @@ def display_fundamentals(
             yoy_df = compute_yoy_table(
                 df=df,
                 label_name=label,
-                statement_period=statement_period
+                statement_period=statement_period,
+                flow=False
             )
 
             if yoy_df is None:
@@ -410,9 +208,6 @@ def display_fundamentals(
     # -----------------------------
     elif statement_tab == "Cash Flow":
 
-        # Load cash flow from DoltHub
-        cash_flow_df = get_dolthub_cash_flow(ticker)
-
         # SINGLE TOGGLE BUTTON
         yoy_toggle = st.checkbox("% Change", value=False)
 
@@ -425,6 +220,7 @@ def display_fundamentals(
             df["period"] = df["period"].astype(str).str.upper()
 
             period_value = "YEAR" if statement_period == "Annual" else "QUARTER"
+            full_df = df
             df = df[df["period"] == period_value]
 
             if df.empty:
@@ -440,8 +236,11 @@ def display_fundamentals(
             # YOY MODE
             # -----------------------------
             if yoy_toggle:
+                # Growth needs annual and quarterly rows (a Q4 only filed in
+                # the annual report is derived, so Q1 has a base)
+                key_cols = [c for c in ("act_symbol", "date", "period") if c in full_df.columns]
                 yoy_df = compute_yoy_table(
-                    df=df_clean,
+                    df=full_df[key_cols + [col for col in CASH_FLOW_FIELDS if col in full_df.columns]],
                     label_name=label,
                     statement_period=statement_period
                 )
@@ -454,67 +253,8 @@ def display_fundamentals(
             # -----------------------------
             # VALUES MODE (default)
             # -----------------------------
-            df_transposed = (
-                df_clean.set_index("date")
-                        .T
-                        .reset_index()
-                        .rename(columns={"index": label})
-            )
-
-            df_transposed[label] = df_transposed[label].str.replace("_", " ").str.title()
-
-            # Format column names (years or quarters)
-            formatted_cols = []
-            for col in df_transposed.columns:
-                if isinstance(col, pd.Timestamp):
-                    if statement_period == "Annual":
-                        formatted_cols.append(col.strftime("%Y"))
-                    else:
-                        q = (col.month - 1) // 3 + 1
-                        formatted_cols.append(f"{col.year} Q{q}")
-                else:
-                    formatted_cols.append(col)
-            df_transposed.columns = formatted_cols
-
-            # Determine best scaling
-            def try_parse(x):
-                try:
-                    return float(str(x).replace(",", ""))
-                except:
-                    return None
-
-            numeric_values = []
-            for col in df_transposed.columns:
-                if col != label:
-                    numeric_values.extend(
-                        [try_parse(x) for x in df_transposed[col] if try_parse(x) is not None]
-                    )
-
-            max_abs_val = max(abs(v) for v in numeric_values) if numeric_values else 1
-
-            if max_abs_val >= 1e12:
-                scale, suffix = 1e12, "T"
-            elif max_abs_val >= 1e9:
-                scale, suffix = 1e9, "B"
-            elif max_abs_val >= 1e6:
-                scale, suffix = 1e6, "M"
-            elif max_abs_val >= 1e3:
-                scale, suffix = 1e3, "K"
-            else:
-                scale, suffix = 1, ""
-
-            def format_scaled(x):
-                val = try_parse(x)
-                return f"{val / scale:,.2f}" if val is not None else "—"
-
-            for col in df_transposed.columns:
-                if col != label:
-                    df_transposed[col] = df_transposed[col].apply(format_scaled)
-
-            st.caption(f"All values shown in **{suffix}**")
-
-            styled_df = style_growth_from_prev(df_transposed, label)
-            st.dataframe(styled_df, use_container_width=True, hide_index=True)
+            table = get_statement_table(ticker or "", "cash_flow", statement_period, df_clean, label)
+            render_statement_table(table, style_growth_from_prev)
 
         # Render it
         render_cash_flow(cash_flow_df)
@@ -523,109 +263,34 @@ def display_fundamentals(
 #### Financial Ratios ####
     elif statement_tab == "Key Ratios":
 
-        # Load CF (needed for Operating Cash Flow Ratio)
-        cash_flow_df = get_dolthub_cash_flow(ticker) if get_dolthub_cash_flow else None
+        # Ratios come from the shared registry (src.ratio_engine); zero or
+        # missing denominators show as "—"
+        ratios = get_ratio_history([ticker], statement_period) if dolt_df is not None else None
 
         # Validate
-        if any(df is None or df.empty for df in [assets_df, liabilities_df, equity_df, cash_flow_df, dolt_df]):
+        if ratios is None or ratios.empty:
             st.warning("Missing data from one or more financial statements. Please ensure all statements are loaded.")
             return
 
-        # Normalize date & period
-        for df in [assets_df, liabilities_df, equity_df, cash_flow_df, dolt_df]:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-            df["period"] = df["period"].astype(str).str.upper()
-
-        # Annual or Quarterly filter
-        period_filter = "YEAR" if statement_period == "Annual" else "QUARTER"
-
-        dolt_period = dolt_df[dolt_df["period"] == period_filter].copy()
-        assets_period = assets_df[assets_df["period"] == period_filter].copy()
-        liabilities_period = liabilities_df[liabilities_df["period"] == period_filter].copy()
-        equity_period = equity_df[equity_df["period"] == period_filter].copy()
-        cash_period = cash_flow_df[cash_flow_df["period"] == period_filter].copy()
-
-        # Merge all statements
-        merged = (
-            dolt_period
-            .merge(assets_period, on="date", suffixes=("", "_assets"))
-            .merge(liabilities_period, on="date", suffixes=("", "_liab"))
-            .merge(equity_period, on="date", suffixes=("", "_eq"))
-            .merge(cash_period, on="date", suffixes=("", "_cf"))
+        ratios = ratios.xs(ticker.upper(), level="act_symbol")
+        ratio_df = pd.DataFrame(
+            ratios.to_numpy().T,
+            columns=period_labels(ratios.index.to_series(), statement_period),
         )
+        ratio_df.insert(0, "Ratio", list(ratios.columns))
 
-        merged.sort_values("date", inplace=True)
-
-        # ---- FIXED PERIOD LABEL ----
-        if statement_period == "Annual":
-            merged["Period"] = merged["date"].dt.year.astype(str)
-        else:  # Quarterly
-            q = merged["date"].dt.quarter.astype(str)
-            y = merged["date"].dt.year.astype(str)
-            merged["Period"] = y + " Q" + q
-
-        # ---- Calculate Ratios ----
-        merged["Net Profit Margin"] = merged["net_income"] / merged["sales"]
-        merged["Gross Margin"] = (merged["sales"] - merged["cost_of_goods"]) / merged["sales"]
-        merged["ROA"] = merged["net_income"] / merged["total_assets"]
-        merged["ROE"] = merged["net_income"] / merged["total_equity"]
-        merged["Debt to Equity"] = merged["total_liabilities"] / merged["total_equity"]
-        merged["Debt Ratio"] = merged["total_liabilities"] / merged["total_assets"]
-        merged["Equity Ratio"] = merged["total_equity"] / merged["total_assets"]
-        merged["Interest Coverage"] = merged["pretax_income"] / merged["interest_expense"]
-        merged["Current Ratio"] = merged["total_current_assets"] / merged["total_current_liabilities"]
-        merged["Cash Ratio"] = merged["cash_and_equivalents"] / merged["total_current_liabilities"]
-
-
-        if "current_liabilities" in merged.columns:
-            merged["Operating Cash Flow Ratio"] = (
-                merged["net_cash_from_operating_activities"] / merged["current_liabilities"]
-            )
-        else:
-            merged["Operating Cash Flow Ratio"] = None
-
-        # Select and pivot for display
-        ratio_cols = [
-            "Period",
-            "Net Profit Margin",
-            "Gross Margin",
-            "ROA",
-            "ROE",
-            "Cash Ratio",
-            "Current Ratio",
-            "Debt to Equity",
-            "Debt Ratio",
-            "Equity Ratio",
-            "Interest Coverage",
-            "Operating Cash Flow Ratio",
-        ]
-
-        ratio_df = merged[ratio_cols].drop_duplicates("Period").set_index("Period").T
-
-        # ---- Formatting ----
-        percent_rows = ["Net Profit Margin", "Gross Margin", "ROA", "ROE", "Debt Ratio", "Equity Ratio", "Debt to Equity"]
-        float_rows = ["Current Ratio", "Cash Ratio", "Interest Coverage", "Operating Cash Flow Ratio"]
-
-        def try_format(val, as_percent=False):
-            try:
-                val = float(val)
-                return f"{val * 100:.1f}%" if as_percent else f"{val:.2f}"
-            except:
-                return "—"
-
-        for row in ratio_df.index:
-            if row in percent_rows:
-                ratio_df.loc[row] = ratio_df.loc[row].apply(lambda x: try_format(x, as_percent=True))
-            if row in float_rows:
-                ratio_df.loc[row] = ratio_df.loc[row].apply(lambda x: try_format(x, as_percent=False))
-
-        # Reset index
-        ratio_df.reset_index(inplace=True)
-        ratio_df.rename(columns={"index": "Ratio"}, inplace=True)
+        # ---- Formatting (display only; values stay numeric) ----
+        value_cols = list(ratio_df.columns[1:])
+        is_percent = ratio_df["Ratio"].isin(ratios_of_kind("percent"))
+        is_float = ratio_df["Ratio"].isin(ratios_of_kind("multiple"))
 
         # Apply cash-flow style coloring
         label_col = ratio_df.columns[0]  # "Ratio"
-        styled_df = style_growth_from_prev(ratio_df, label_col)
+        styled_df = (
+            style_growth_from_prev(ratio_df, label_col)
+            .format(lambda x: f"{x * 100:.1f}%", subset=pd.IndexSlice[is_percent, value_cols], na_rep="—")
+            .format("{:.2f}", subset=pd.IndexSlice[is_float, value_cols], na_rep="—")
+        )
 
         st.dataframe(styled_df, use_container_width=True, hide_index=True)
 
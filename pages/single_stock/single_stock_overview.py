@@ -3,7 +3,7 @@
 import streamlit as st
 import pandas as pd
 from .utils import (
-    get_yf_data,
+    get_yf_info,
     get_dolthub_income_statement,
     get_dolthub_balance_sheet_assets,
     get_dolthub_balance_sheet_liabilities,
@@ -11,6 +11,7 @@ from .utils import (
     format_num,
     format_ratio,
     safe,
+    using_snapshot,
     CASH_FLOW_FIELDS
 )
 
@@ -115,7 +116,7 @@ def display_overview(ticker):
 
     inject_overview_css()
 
-    yf_df, info = get_yf_data(ticker)
+    info = get_yf_info(ticker)
     dolt_df = get_dolthub_income_statement(ticker.upper())
 
     dolt_error = None
@@ -126,7 +127,10 @@ def display_overview(ticker):
     using_dolthub = not dolt_df.empty
 
     st.subheader(f"{info.get('shortName', ticker.upper())} ({ticker.upper()})")
-    st.caption(f"**Data Source:** {'📦 DoltHub (EDGAR)' if using_dolthub else '🌐 Yahoo Finance'}")
+    source = '📦 DoltHub (EDGAR)' if using_dolthub else '🌐 Yahoo Finance'
+    if using_dolthub and using_snapshot():
+        source += " — offline snapshot (Dolt server unreachable)"
+    st.caption(f"**Data Source:** {source}")
     if dolt_error:
         st.warning(f"DoltHub error: {dolt_error} (fallback to Yahoo Finance)")
 
@@ -0,0 +1,133 @@
+# pages/single_stock/statement_table.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.figure_cache import fingerprint
+
+META_COLUMNS = ("date", "act_symbol", "period")
+
+SCALES = [
+    (1e12, "T"),
+    (1e9, "B"),
+    (1e6, "M"),
+    (1e3, "K"),
+]
+
+
+class StatementTable:
+    """
+    One statement for one period type, kept numeric: `values` is a float
+    matrix [metric x period] already divided by `scale`. Strings are only
+    produced when the table is rendered (Styler.format).
+    """
+
+    def __init__(self, label, metrics, periods, values, scale, suffix):
+        self.label = label
+        self.metrics = metrics
+        self.periods = periods
+        self.values = values
+        self.scale = scale
+        self.suffix = suffix
+
+    def frame(self):
+        """Display frame: label column plus one float column per period."""
+        df = pd.DataFrame(self.values, columns=self.periods)
+        df.insert(0, self.label, self.metrics)
+        return df
+
+
+def pick_scale(values):
+    """(scale, suffix) for a float matrix, from one NaN-aware max reduction."""
+    finite = np.abs(values[np.isfinite(values)])
+    max_abs = finite.max() if finite.size else 1
+    for scale, suffix in SCALES:
+        if max_abs >= scale:
+            return scale, suffix
+    return 1, ""
+
+
+def period_labels(dates, statement_period):
+    """"2024" for annual rows, "2024 Q3" for quarterly rows; made unique."""
+    if statement_period == "Annual":
+        labels = dates.dt.year.astype(str)
+    else:
+        labels = dates.dt.year.astype(str) + " Q" + dates.dt.quarter.astype(str)
+
+    seen = {}
+    unique = []
+    for label in labels:
+        seen[label] = seen.get(label, 0) + 1
+        unique.append(label if seen[label] == 1 else f"{label}_{seen[label]}")
+    return unique
+
+
+def build_statement_table(df, label, statement_period, columns=None):
+    """
+    Builds a StatementTable from a DoltHub statement frame (one row per
+    filing). Rows are filtered to the selected period type and ordered by
+    date; `columns` restricts and orders the metrics. Returns None if no rows
+    or no numeric metrics are left.
+    """
+    if df is None or df.empty or "date" not in df.columns:
+        return None
+
+    dates = pd.to_datetime(df["date"], errors="coerce")
+    mask = dates.notna()
+    if "period" in df.columns:
+        stored = "YEAR" if statement_period == "Annual" else "QUARTER"
+        mask &= df["period"].astype(str).str.upper() == stored
+    if not mask.any():
+        return None
+
+    rows = df[mask].assign(date=dates[mask]).sort_values("date", kind="stable")
+    if columns is None:
+        columns = [
+            c for c in rows.columns
+            if c not in META_COLUMNS and pd.api.types.is_numeric_dtype(rows[c])
+        ]
+    else:
+        columns = [c for c in columns if c in rows.columns]
+    if not columns:
+        return None
+
+    values = rows[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64).T
+    scale, suffix = pick_scale(values)
+    metrics = [c.replace("_", " ").title() for c in columns]
+    return StatementTable(label, metrics, period_labels(rows["date"], statement_period), values / scale, scale, suffix)
+
+
+@st.cache_resource(max_entries=256)
+def _cached_statement_table(ticker, statement, statement_period, data_fingerprint, _df, label, columns):
+    return build_statement_table(_df, label, statement_period, list(columns) if columns else None)
+
+
+def get_statement_table(ticker, statement, statement_period, df, label, columns=None):
+    """
+    Memoized per (ticker, statement, period type); the data fingerprint
+    makes a new Dolt commit build a fresh table.
+    """
+    if df is None or df.empty:
+        return None
+    return _cached_statement_table(
+        ticker.upper(),
+        statement,
+        statement_period,
+        fingerprint(df),
+        df,
+        label,
+        tuple(columns) if columns else None,
+    )
+
+
+def render_statement_table(table, style_growth_from_prev):
+    if table is None:
+        st.info("No numeric data available for this statement.")
+        return
+
+    st.caption(f"All values shown in **{table.suffix}**")
+    df = table.frame()
+    styled = style_growth_from_prev(df, table.label).format(
+        "{:,.2f}", subset=list(df.columns[1:]), na_rep="—"
+    )
+    st.dataframe(styled, use_container_width=True, hide_index=True)
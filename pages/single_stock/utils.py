@@ -1,9 +1,25 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 import yfinance as yf
 import plotly.graph_objects as go
-from sqlalchemy import create_engine
-import pymysql
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+from src.earnings_db import read_ratio_panels, read_statement, read_statements, using_snapshot
+from src import price_store
+from src.aligned_panel import cached_aligned_panel
+from src.figure_cache import fingerprint
+from src.frame_cache import FrameCache
+from src.growth_analytics import cached_growth_panel
+from src.ratio_engine import build_ratio_panel, cached_ratios
+from src.indicators import get_indicator_engine
+from src.info_cache import get_info_cache
+from src.ticker_index import get_ticker_index, search_tickers
+from src.yf_scheduler import get_yf_scheduler
 
 CASH_FLOW_FIELDS = [
     "net_income",
@@ -33,97 +49,393 @@ CASH_FLOW_FIELDS = [
 # -----------------------------
 # Data Sources
 # -----------------------------
-@st.cache_data(ttl=86400)
-def get_dolthub_income_statement(ticker):
+# DoltHub loaders are cached per (Dolt commit, table, ticker) inside src.earnings_db,
+# shared with the batched loader below. Optional filters (period="Annual",
+# latest=1, columns=[...], start/end dates) are pushed down into the query;
+# see src.earnings_db.read_statements.
+def get_dolthub_income_statement(ticker, **filters):
     try:
-        engine = create_engine("mysql+pymysql://root@localhost:3307/earnings")
-        query = f"""
-            SELECT * FROM income_statement
-            WHERE act_symbol = '{ticker.upper()}'
-            ORDER BY date DESC;
-        """
-        df = pd.read_sql(query, con=engine)
-        return df
+        return read_statement("income_statement", ticker, **filters)
     except Exception as e:
         return f"ERROR::{str(e)}"
 
 # -----------------------------
 # NEW: Balance Sheet Loaders
 # -----------------------------
-@st.cache_data(ttl=86400)
-def get_dolthub_balance_sheet_assets(ticker):
+def get_dolthub_balance_sheet_assets(ticker, **filters):
     try:
-        engine = create_engine("mysql+pymysql://root@localhost:3307/earnings")
-        query = f"""
-            SELECT * FROM balance_sheet_assets
-            WHERE act_symbol = '{ticker.upper()}'
-            ORDER BY date DESC;
-        """
-        return pd.read_sql(query, con=engine)
+        return read_statement("balance_sheet_assets", ticker, **filters)
     except Exception as e:
         return f"ERROR::{str(e)}"
 
-@st.cache_data(ttl=86400)
-def get_dolthub_balance_sheet_liabilities(ticker):
+def get_dolthub_balance_sheet_liabilities(ticker, **filters):
     try:
-        engine = create_engine("mysql+pymysql://root@localhost:3307/earnings")
-        query = f"""
-            SELECT * FROM balance_sheet_liabilities
-            WHERE act_symbol = '{ticker.upper()}'
-            ORDER BY date DESC;
-        """
-        return pd.read_sql(query, con=engine)
+        return read_statement("balance_sheet_liabilities", ticker, **filters)
     except Exception as e:
         return f"ERROR::{str(e)}"
 
 
-@st.cache_data(ttl=86400)
-def get_dolthub_balance_sheet_equity(ticker):
+def get_dolthub_balance_sheet_equity(ticker, **filters):
     try:
-        engine = create_engine("mysql+pymysql://root@localhost:3307/earnings")
-        query = f"""
-            SELECT * FROM balance_sheet_equity
-            WHERE act_symbol = '{ticker.upper()}'
-            ORDER BY date DESC;
-        """
-        return pd.read_sql(query, con=engine)
+        return read_statement("balance_sheet_equity", ticker, **filters)
     except Exception as e:
         return f"ERROR::{str(e)}"
 
-@st.cache_data(ttl=86400)
-def get_dolthub_cash_flow(ticker):
+def get_dolthub_cash_flow(ticker, **filters):
     try:
-        engine = create_engine("mysql+pymysql://root@localhost:3307/earnings")
-        query = f"""
-            SELECT * FROM cash_flow_statement
-            WHERE act_symbol = '{ticker.upper()}'
-            ORDER BY date DESC;
-        """
-        return pd.read_sql(query, con=engine)
+        return read_statement("cash_flow_statement", ticker, **filters)
     except Exception as e:
         return f"ERROR::{str(e)}"
 
-@st.cache_data(ttl=86400)
-def get_yf_data(ticker):
+def get_dolthub_statements(table, tickers, **filters):
+    """
+    Batched loader: fetches one statement table for many tickers in a single
+    query. Returns {TICKER: DataFrame}, or "ERROR::..." per ticker on failure.
+    """
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        df = stock.financials.T
-        df.index = pd.to_datetime(df.index)
-        return df, info
+        return read_statements(table, tickers, **filters)
     except Exception as e:
-        return None, {"error": str(e)}
+        return {t.upper(): f"ERROR::{str(e)}" for t in tickers}
+
+def get_growth_panel(table, tickers, flow=True):
+    """
+    Growth measures (src.growth_analytics) of one statement table for many
+    tickers, from all of their annual and quarterly rows. Memoized on the
+    loaded data, so the single-stock and comparison pages share the result.
+    Returns None when nothing could be loaded.
+    """
+    statements = get_dolthub_statements(table, tickers)
+    frames = [df for df in statements.values() if isinstance(df, pd.DataFrame) and not df.empty]
+    if not frames:
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    return cached_growth_panel(table, fingerprint(df), df, None, flow)
+
+def get_aligned_panel(table, tickers, statement_period):
+    """
+    Full history of one statement table for many tickers, aligned on
+    calendar periods (src.aligned_panel) so companies with different fiscal
+    years line up. One batched query; memoized on the loaded data. Returns
+    None when nothing could be loaded.
+    """
+    period = "Annual" if statement_period == "Annual" else "Quarterly"
+    statements = get_dolthub_statements(table, tickers, period=period)
+    frames = [df for df in statements.values() if isinstance(df, pd.DataFrame) and not df.empty]
+    if not frames:
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    return cached_aligned_panel(table, period, fingerprint(df), df, tuple(t.upper() for t in tickers))
+
+def get_ratio_panels(tickers, statement_period):
+    """
+    Aligned ratio inputs (income, balance sheet and cash flow fields joined
+    by date) for each ticker, from one query. Returns {TICKER: DataFrame},
+    or "ERROR::..." per ticker on failure.
+    """
+    try:
+        return read_ratio_panels(tickers, statement_period)
+    except Exception as e:
+        return {t.upper(): f"ERROR::{str(e)}" for t in tickers}
+
+def get_ratio_panel(ticker, statement_period):
+    return get_ratio_panels([ticker], statement_period)[ticker.upper()]
+
+def get_ratio_history(tickers, statement_period):
+    """
+    Every ratio of src.ratio_engine.RATIOS for every report of the given
+    tickers, indexed by (act_symbol, date). Memoized on the loaded panels,
+    so both pages read the same numbers. Returns None without data.
+    """
+    panel = build_ratio_panel(get_ratio_panels(tickers, statement_period))
+    if panel is None:
+        return None
+    return cached_ratios(fingerprint(panel), panel)
+
+# Every yfinance request goes through one process-wide scheduler
+# (src.yf_scheduler): identical in-flight requests are coalesced, the request
+# rate is capped, failures are retried with backoff, and while Yahoo keeps
+# failing the last good result is served instead.
+def _yf_call(key, fn):
+    return get_yf_scheduler().call(key, fn)
 
 @st.cache_data(ttl=86400)
+def get_yf_financials(ticker):
+    def fetch():
+        df = yf.Ticker(ticker).financials.T
+        df.index = pd.to_datetime(df.index)
+        return df
+    try:
+        return _yf_call(("financials", ticker.upper()), fetch)
+    except Exception:
+        return None
+
+# Company info goes through a disk-backed cache of just the overview fields
+# (src.info_cache), so cards render from disk right after a restart and
+# stale entries refresh in the background.
+def _fetch_info(symbol):
+    return _yf_call(("info", symbol), lambda: yf.Ticker(symbol).info)
+
+def get_yf_info(ticker):
+    info = get_info_cache().get(ticker, _fetch_info)
+    if "error" not in info:
+        # Makes the name (and any exchange suffix) searchable in the typeahead
+        get_ticker_index().add(ticker, info.get("shortName"))
+    return info
+
+def get_yf_data(ticker):
+    return get_yf_financials(ticker), get_yf_info(ticker)
+
+# Price history is cached once per (ticker, interval) in a process-wide
+# FrameCache. The entry is the widest window loaded so far (at least
+# PRICE_BASE_PERIOD for daily and coarser bars), and every narrower range is
+# a slice of it, so switching ranges needs no download and holds no duplicate
+# bars. Daily and coarser bars are also persisted in src.price_store, so a
+# restart or an expired entry only downloads the bars added since the last visit.
+PRICE_CACHE_MAX_ENTRIES = int(os.getenv("PRICE_CACHE_MAX_ENTRIES", "512"))
+PRICE_BASE_PERIOD = os.getenv("PRICE_BASE_PERIOD", "5y")
+
+@st.cache_resource
+def _price_cache():
+    return FrameCache(max_entries=PRICE_CACHE_MAX_ENTRIES, ttl=86400)
+
+def _fetch_history(symbol, interval, period=None, start=None):
+    def fetch():
+        stock = yf.Ticker(symbol)
+        if start is not None:
+            return stock.history(start=start, interval=interval)
+        return stock.history(period=period, interval=interval)
+    return _yf_call(("history", symbol, interval, period, str(start)), fetch)
+
+def _window_period(period, interval):
+    """Period to download so later, narrower requests are served by slicing."""
+    if price_store.is_stored_interval(interval):
+        return price_store.widest(period, PRICE_BASE_PERIOD)
+    return period
+
+def _cached_window(symbol, period, interval):
+    """The cached window of `symbol` if it covers `period`, else None."""
+    window = _price_cache().get((symbol, interval))
+    if window is None or not price_store.period_covers(window.attrs.get("period"), period):
+        return None
+    return window
+
 def get_historical_data(ticker, period="6mo", interval="1d"):
+    symbol = ticker.upper()
+    window = _cached_window(symbol, period, interval)
+    if window is not None:
+        return price_store.slice_period(window, period)
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period=period, interval=interval)
-        return hist
+        window_period = _window_period(period, interval)
+        if price_store.is_stored_interval(interval):
+            window = price_store.load_history(symbol, window_period, interval, _fetch_history)
+        else:
+            window = _fetch_history(symbol, interval, period=window_period)
+            window.attrs["period"] = window_period
+        # Empty or stale windows are not cached, so the next rerun retries Yahoo
+        if not window.empty and not window.attrs.get("stale"):
+            _price_cache().put((symbol, interval), window)
+        return price_store.slice_period(window, period)
     except Exception as e:
         st.error(f"Failed to load historical data: {e}")
         return pd.DataFrame()
 
+def get_indicator(ticker, name, period="6mo", interval="1d", **params):
+    """
+    Indicator `name` (see src.indicators.INDICATORS) for the bars of
+    get_historical_data(ticker, period). It is computed over the whole cached
+    window, so long averages are already warmed up at the start of the
+    range, and memoized per (ticker, indicator, params): appended bars only
+    extend the previous result.
+    """
+    hist = get_historical_data(ticker, period=period, interval=interval)
+    if hist.empty:
+        return pd.DataFrame()
+    window = _cached_window(ticker.upper(), period, interval)
+    if window is None:
+        window = hist
+    result = get_indicator_engine().compute(ticker.upper(), interval, name, window, **params)
+    return result.loc[result.index >= hist.index[0]]
+
+def _download_histories(symbols, period, interval):
+    """One yf.download request for many symbols; returns {SYMBOL: history}."""
+    data = _yf_call(("download", tuple(symbols), period, interval), lambda: yf.download(
+        symbols,
+        period=period,
+        interval=interval,
+        group_by="ticker",
+        auto_adjust=True,
+        actions=True,
+        ignore_tz=False,
+        threads=True,
+        progress=False,
+    ))
+    histories = {}
+    if data is None or data.empty:
+        return histories
+    for symbol in symbols:
+        if symbol not in data.columns.get_level_values(0):
+            continue
+        hist = data[symbol].dropna(how="all")
+        if not hist.empty:
+            hist.columns.name = None
+            histories[symbol] = hist
+    return histories
+
+def get_historical_data_batch(tickers, period="6mo", interval="1d"):
+    """
+    Returns {TICKER: history} for many tickers. Cached windows are sliced
+    in memory, then fresh entries of the on-disk price store are used;
+    tickers with no usable stored window are requested together in one bulk
+    download. Stale stored tickers and anything the bulk request misses go
+    through get_historical_data() on the shared I/O pool, which only fetches
+    the missing tail. Every window lands in the same per-ticker cache, so
+    the single-stock page benefits too.
+    """
+    cache = _price_cache()
+    symbols = list(dict.fromkeys(t.upper() for t in tickers))
+    stored_interval = price_store.is_stored_interval(interval)
+    window_period = _window_period(period, interval)
+
+    result = {}
+    to_download = []
+    incremental = []
+    for symbol in symbols:
+        window = _cached_window(symbol, period, interval)
+        if window is not None:
+            result[symbol] = price_store.slice_period(window, period)
+            continue
+        stored, meta = price_store.read(symbol, interval) if stored_interval else (None, None)
+        if stored is None or stored.empty or not price_store.period_covers(meta.get("period"), period):
+            to_download.append(symbol)
+        elif price_store.is_fresh(meta):
+            cache.put((symbol, interval), stored)
+            result[symbol] = price_store.slice_period(stored, period)
+        else:
+            incremental.append(symbol)
+
+    if to_download:
+        try:
+            downloaded = _download_histories(to_download, window_period, interval)
+        except Exception:
+            downloaded = {}
+        for symbol, window in downloaded.items():
+            if stored_interval:
+                price_store.save(symbol, interval, window_period, window)
+            else:
+                window.attrs["period"] = window_period
+            cache.put((symbol, interval), window)
+            result[symbol] = price_store.slice_period(window, period)
+        incremental += [s for s in to_download if s not in downloaded]
+
+    if incremental:
+        result.update(run_concurrently({
+            symbol: (get_historical_data, (symbol,), {"period": period, "interval": interval})
+            for symbol in incremental
+        }))
+
+    return {symbol: result[symbol] for symbol in symbols}
+
+def get_close_panel(tickers, period="6mo", interval="1d"):
+    """Close prices of several tickers aligned on one date index."""
+    histories = get_historical_data_batch(tickers, period=period, interval=interval)
+    return pd.DataFrame({
+        symbol: hist["Close"]
+        for symbol, hist in histories.items()
+        if not hist.empty and "Close" in hist.columns
+    })
+
+# -----------------------------
+# Concurrent Loading
+# -----------------------------
+# Shared by all sessions, so concurrent page loads cannot open more than
+# this many simultaneous Dolt/yfinance calls.
+IO_POOL_WORKERS = int(os.getenv("IO_POOL_WORKERS", "8"))
+
+@st.cache_resource
+def _io_pool():
+    return ThreadPoolExecutor(max_workers=IO_POOL_WORKERS, thread_name_prefix="io")
+
+def run_concurrently(tasks):
+    """
+    Runs {key: (fn, args, kwargs)} on the shared I/O pool and returns
+    {key: result}. Each worker is attached to the current script run so
+    cached functions and st.* calls inside the loaders behave as usual,
+    and detached again afterwards: pool threads are shared between
+    sessions and must not keep another user's context.
+    """
+    ctx = get_script_run_ctx()
+
+    def run(fn, args, kwargs):
+        thread = threading.current_thread()
+        previous = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            add_script_run_ctx(thread, ctx)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            # add_script_run_ctx cannot detach, so a pool thread that had no
+            # context gets the attribute removed
+            if previous is not None:
+                add_script_run_ctx(thread, previous)
+            elif hasattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME):
+                delattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME)
+
+    pool = _io_pool()
+    futures = {key: pool.submit(run, fn, args, kwargs) for key, (fn, args, kwargs) in tasks.items()}
+    return {key: future.result() for key, future in futures.items()}
+
+def load_ticker_bundle(ticker, statement_period):
+    """
+    Loads everything the single-stock page needs for a ticker in parallel:
+    the full income statement, Yahoo Finance data, the balance sheet tables
+    for the selected period and the full cash flow statement (its growth
+    view needs annual and quarterly rows). A cold ticker then costs roughly
+    the slowest single call instead of the sum of all of them.
+    """
+    period = "Annual" if statement_period == "Annual" else "Quarterly"
+    return run_concurrently({
+        "income": (get_dolthub_income_statement, (ticker,), {}),
+        "yf": (get_yf_data, (ticker,), {}),
+        "assets": (get_dolthub_balance_sheet_assets, (ticker,), {"period": period}),
+        "liabilities": (get_dolthub_balance_sheet_liabilities, (ticker,), {"period": period}),
+        "equity": (get_dolthub_balance_sheet_equity, (ticker,), {"period": period}),
+        "cash_flow": (get_dolthub_cash_flow, (ticker,), {}),
+    })
+
+# -----------------------------
+# Ticker Search
+# -----------------------------
+def ticker_input(label, key, container=st, limit=8):
+    """
+    Text input with typeahead: as the user types, matching tickers and
+    company names from the ticker index are offered as pills below it.
+    Clicking one replaces the typed text. Returns the upper-cased input.
+    """
+    suggestion_key = f"{key}_suggestion"
+
+    def use_suggestion():
+        choice = st.session_state.get(suggestion_key)
+        if choice:
+            st.session_state[key] = choice
+        st.session_state[suggestion_key] = None
+
+    value = container.text_input(label, key=key).strip().upper()
+
+    if value:
+        matches = [m for m in search_tickers(value, limit) if m.symbol != value]
+        if matches:
+            names = {m.symbol: m.name for m in matches}
+            container.pills(
+                "Suggestions",
+                options=list(names),
+                format_func=lambda s: f"{s} · {names[s]}" if names[s] else s,
+                key=suggestion_key,
+                on_change=use_suggestion,
+                label_visibility="collapsed",
+            )
+
+    return value
+
 # -----------------------------
 # Format Helpers
 # -----------------------------
@@ -177,63 +489,45 @@ def format_ratio(val):
     except:
         return "—"
     
-def style_growth_from_prev(df, label_col):
-    import numpy as np
+# Text colors for table cells: up, down, unchanged
+POSITIVE_COLOR = "color: #6FCF97"
+NEGATIVE_COLOR = "color: #D87C6E"
+NEUTRAL_COLOR = "color: white"
 
-    def try_float(x):
-        try:
-            s = str(x).replace(",", "").strip()
-            if s.endswith("%"):
-                return float(s[:-1])     # convert "5.23%" → 5.23
-            return float(s)
-        except:
-            return np.nan
-
-    def apply_row_gradient(row):
-        result = [""]
-
-        for i in range(1, len(row)):
-            prev, curr = row[i - 1], row[i]
-            prev_f = try_float(prev)
-            curr_f = try_float(curr)
-
-            if np.isnan(prev_f) or np.isnan(curr_f):
-                result.append("")
-            elif curr_f > prev_f:
-                result.append("color: #6FCF97")   # green
-            elif curr_f < prev_f:
-                result.append("color: #D87C6E")   # red
-            else:
-                result.append("color: white")
-        
-        return result
+def _sign_css(values):
+    """CSS per cell from the sign of a float matrix (NaN -> no style)."""
+    return np.select(
+        [values > 0, values < 0, values == 0],
+        [POSITIVE_COLOR, NEGATIVE_COLOR, NEUTRAL_COLOR],
+        default="",
+    )
 
-    return df.style.apply(apply_row_gradient, axis=1, subset=df.columns[1:])
+def _numeric_block(block):
+    return block.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
 
-def style_yoy_percent(df, label_col):
-    import numpy as np
+def style_growth_from_prev(df, label_col):
+    """
+    Colors each value by its change from the previous column (green up, red
+    down). Expects numeric value columns; colors for the whole table come
+    from one np.diff over the matrix.
+    """
+    def color_block(block):
+        values = _numeric_block(block)
+        change = np.full(values.shape, np.nan)
+        change[:, 1:] = np.diff(values, axis=1)
+        return pd.DataFrame(_sign_css(change), index=block.index, columns=block.columns)
 
-    def try_float(x):
-        try:
-            s = str(x).replace("%", "").replace(",", "").strip()
-            return float(s)
-        except:
-            return np.nan
-
-    def apply_color(row):
-        result = [""]  # skip label column
-        for val in row[1:]:
-            f = try_float(val)
-            if np.isnan(f):
-                result.append("")
-            elif f > 0:
-                result.append("color: #6FCF97")  # green
-            elif f < 0:
-                result.append("color: #D87C6E")  # red
-            else:
-                result.append("color: white")
-        return result
+    return df.style.apply(color_block, axis=None, subset=df.columns[1:])
 
-    return df.style.apply(apply_color, axis=1)
+def style_yoy_percent(df, label_col):
+    """Colors numeric % changes by sign and formats them as "12.34%"."""
+    value_cols = [c for c in df.columns if c != label_col]
 
+    def color_block(block):
+        return pd.DataFrame(_sign_css(_numeric_block(block)), index=block.index, columns=block.columns)
 
+    return (
+        df.style
+        .apply(color_block, axis=None, subset=value_cols)
+        .format("{:.2f}%", subset=value_cols, na_rep="—")
+    )
@@ -1,6 +1,4 @@
 import streamlit as st
-from google import genai
-from playwright.sync_api import sync_playwright
 import time
 from datetime import datetime
 from typing import List, Tuple, Dict, Any # Added typing for clarity
@@ -43,6 +41,9 @@ def scrape_and_summarize(urls: list, topic: str, _client) -> dict:
     
     progress_bar = st.progress(0, text="Starting news analysis...")
     
+    # Imported here: Playwright is slow to import and only needed on submit
+    from playwright.sync_api import sync_playwright
+
     with sync_playwright() as p:
         # Launch Chrome headless
         browser = p.chromium.launch(headless=True)
@@ -0,0 +1,152 @@
+# src/aligned_panel.py
+"""
+Statement history of several companies aligned on calendar periods.
+
+Companies report on different fiscal calendars (Apple's year ends in
+September, Microsoft's in June), so report dates rarely match exactly.
+Every filing is mapped to the calendar period whose end is nearest its own
+period end, with `merge_asof` and a tolerance; filings too far from any
+period end are dropped. The result is a dense float array
+[ticker x period x metric], so a page can show any period for all tickers
+without loading anything again.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+META_COLUMNS = ("act_symbol", "date", "period")
+
+# Period type -> (stored Dolt period, pandas frequency, max distance to the
+# calendar period end)
+CALENDARS = {
+    "Annual": ("YEAR", "Y", pd.Timedelta(days=183)),
+    "Quarterly": ("QUARTER", "Q", pd.Timedelta(days=46)),
+}
+
+
+def period_label(period):
+    """"2024" for years, "2024 Q3" for quarters."""
+    return str(period) if period.freqstr.startswith("Y") else f"{period.year} Q{period.quarter}"
+
+
+def calendar_periods(dates, statement_period):
+    """
+    Calendar period of each report date (Series of Timestamps), or NaT when
+    no period end lies within the tolerance. Order of `dates` is kept.
+    """
+    _, freq, tolerance = CALENDARS[statement_period]
+    dates = pd.to_datetime(dates, errors="coerce")
+    out = np.full(len(dates), pd.NaT, dtype=object)
+    valid = dates.notna().to_numpy()
+    if not valid.any():
+        return pd.Series(pd.array(out, dtype=f"period[{freq}]"), index=dates.index)
+
+    first = dates[valid].min().to_period(freq) - 1
+    last = dates[valid].max().to_period(freq) + 1
+    grid = pd.period_range(first, last, freq=freq)
+    ends = pd.DataFrame({
+        "period_end": grid.to_timestamp(how="end").normalize(),
+        "calendar_period": grid,
+    })
+
+    left = pd.DataFrame({"date": dates.to_numpy()[valid], "row": np.flatnonzero(valid)})
+    matched = pd.merge_asof(
+        left.sort_values("date"), ends, left_on="date", right_on="period_end",
+        direction="nearest", tolerance=tolerance,
+    )
+    out[matched["row"].to_numpy()] = matched["calendar_period"].to_numpy()
+    return pd.Series(pd.array(out, dtype=f"period[{freq}]"), index=dates.index)
+
+
+class AlignedPanel:
+    """
+    `values[t, p, m]` is metric m of ticker t for calendar period p (NaN
+    when the ticker has no filing for it); `dates[t, p]` is the report date
+    the value came from.
+    """
+
+    def __init__(self, tickers, periods, metrics, values, dates):
+        self.tickers = tickers
+        self.periods = periods
+        self.metrics = metrics
+        self.values = values
+        self.dates = dates
+        self._period_index = {period: p for p, period in enumerate(periods)}
+
+    def reported(self):
+        """Boolean [ticker x period]: the ticker filed for the period."""
+        return ~np.isnat(self.dates)
+
+    def latest_common_period(self):
+        """Newest period every ticker filed for, else the newest with any filing."""
+        reported = self.reported()
+        for mask in (reported.all(axis=0), reported.any(axis=0)):
+            if mask.any():
+                return self.periods[np.flatnonzero(mask)[-1]]
+        return None
+
+    def period_frame(self, period):
+        """Metrics x tickers for one period label; tickers without a filing are left out."""
+        p = self._period_index[period]
+        present = ~np.isnat(self.dates[:, p])
+        return pd.DataFrame(
+            self.values[present, p, :].T,
+            index=self.metrics,
+            columns=[t for t, ok in zip(self.tickers, present) if ok],
+        )
+
+    def report_dates(self, period):
+        """{ticker: report date} of the filings behind one period."""
+        p = self._period_index[period]
+        return {
+            ticker: pd.Timestamp(date)
+            for ticker, date in zip(self.tickers, self.dates[:, p])
+            if not np.isnat(date)
+        }
+
+
+def build_aligned_panel(df, statement_period, metrics=None, tickers=None):
+    """
+    Aligns the filings in `df` (DoltHub statement rows for any number of
+    tickers) of one period type. When two filings land in the same period
+    the later one wins. `tickers` fixes the ticker order (and keeps tickers
+    without data as empty rows).
+    """
+    stored, _, _ = CALENDARS[statement_period]
+    rows = df[df["period"].astype(str).str.upper() == stored]
+    rows = rows.assign(
+        act_symbol=rows["act_symbol"].astype(str).str.upper(),
+        date=pd.to_datetime(rows["date"], errors="coerce"),
+    )
+    if metrics is None:
+        metrics = [
+            c for c in rows.columns
+            if c not in META_COLUMNS and pd.api.types.is_numeric_dtype(rows[c])
+        ]
+    metrics = list(metrics)
+    tickers = list(dict.fromkeys(t.upper() for t in tickers)) if tickers else sorted(rows["act_symbol"].unique())
+
+    rows = rows.assign(calendar_period=calendar_periods(rows["date"], statement_period))
+    rows = (
+        rows.dropna(subset=["calendar_period"])
+        .sort_values("date")
+        .drop_duplicates(["act_symbol", "calendar_period"], keep="last")
+    )
+    rows = rows[rows["act_symbol"].isin(tickers)]
+
+    grid = sorted(rows["calendar_period"].unique())
+    periods = [period_label(period) for period in grid]
+    t_idx = pd.Index(tickers).get_indexer(rows["act_symbol"])
+    p_idx = pd.Index(grid).get_indexer(rows["calendar_period"])
+
+    values = np.full((len(tickers), len(periods), len(metrics)), np.nan)
+    dates = np.full((len(tickers), len(periods)), np.datetime64("NaT"), dtype="datetime64[ns]")
+    values[t_idx, p_idx, :] = rows[metrics].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    dates[t_idx, p_idx] = rows["date"].to_numpy(dtype="datetime64[ns]")
+    return AlignedPanel(tickers, periods, metrics, values, dates)
+
+
+@st.cache_resource(max_entries=64)
+def cached_aligned_panel(statement, statement_period, data_fingerprint, _df, tickers):
+    """Memoized per (statement, period type, data fingerprint, tickers); the frame itself is not hashed."""
+    return build_aligned_panel(_df, statement_period, tickers=list(tickers))
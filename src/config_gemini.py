@@ -1,7 +1,10 @@
 # src/config_gemini.py
 import os
 from functools import lru_cache
-from google import genai
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from google import genai
 
 
 class MissingGeminiKey(RuntimeError):
@@ -9,7 +12,11 @@ class MissingGeminiKey(RuntimeError):
 
 
 @lru_cache
-def get_gemini_client() -> genai.Client:
+def get_gemini_client() -> "genai.Client":
+    # google-genai is imported on first use so pages that never call
+    # Gemini do not pay for it
+    from google import genai
+
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise MissingGeminiKey(
@@ -0,0 +1,14 @@
+# src/data_paths.py
+import os
+
+# Local caches (Parquet mirror, snapshots, price history, ...) live here.
+# Set FINANCE_DASHBOARD_DATA_DIR to keep them outside the checkout.
+DATA_DIR = os.getenv(
+    "FINANCE_DASHBOARD_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"),
+)
+
+
+def data_path(*parts):
+    """Returns a path under DATA_DIR."""
+    return os.path.join(DATA_DIR, *parts)
@@ -0,0 +1,409 @@
+# src/earnings_db.py
+import os
+import re
+import time
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import bindparam, create_engine, text
+from sqlalchemy.engine import make_url
+
+from src import earnings_mirror, earnings_snapshot
+from src.frame_cache import FrameCache
+
+# -----------------------------
+# Connection Settings
+# -----------------------------
+# Override any of these with environment variables, e.g.
+#   EARNINGS_DB_URL=mysql+pymysql://root@db-host:3307/earnings
+EARNINGS_DB_URL = os.getenv("EARNINGS_DB_URL", "mysql+pymysql://root@localhost:3307/earnings")
+EARNINGS_DB_POOL_SIZE = int(os.getenv("EARNINGS_DB_POOL_SIZE", "5"))
+EARNINGS_DB_MAX_OVERFLOW = int(os.getenv("EARNINGS_DB_MAX_OVERFLOW", "10"))
+EARNINGS_DB_POOL_TIMEOUT = int(os.getenv("EARNINGS_DB_POOL_TIMEOUT", "10"))
+EARNINGS_DB_POOL_RECYCLE = int(os.getenv("EARNINGS_DB_POOL_RECYCLE", "1800"))
+EARNINGS_DB_CONNECT_TIMEOUT = int(os.getenv("EARNINGS_DB_CONNECT_TIMEOUT", "2"))
+
+# "auto" uses the Dolt server and falls back to the SQLite snapshot when the
+# server is unreachable; "server" or "snapshot" pins one source.
+EARNINGS_DB_MODE = os.getenv("EARNINGS_DB_MODE", "auto")
+
+# Per-(commit, table, ticker) frames kept in memory, shared by all sessions.
+# Entries never expire on their own: they are keyed by the Dolt HEAD commit,
+# which is re-checked every EARNINGS_HEAD_CHECK_SECONDS, so a `dolt pull`
+# invalidates them and an unchanged database keeps them hot.
+EARNINGS_CACHE_MAX_ENTRIES = int(os.getenv("EARNINGS_CACHE_MAX_ENTRIES", "2048"))
+EARNINGS_HEAD_CHECK_SECONDS = int(os.getenv("EARNINGS_HEAD_CHECK_SECONDS", "30"))
+
+# Fallback when the HEAD commit cannot be read: expire entries daily
+EARNINGS_CACHE_TTL = 86400
+
+# Columns each statement contributes to the ratio panel
+RATIO_PANEL_FIELDS = {
+    "income_statement": ("sales", "cost_of_goods", "net_income", "pretax_income", "interest_expense"),
+    "balance_sheet_assets": ("total_assets", "total_current_assets", "cash_and_equivalents"),
+    "balance_sheet_liabilities": ("total_liabilities", "total_current_liabilities"),
+    "balance_sheet_equity": ("total_equity",),
+    "cash_flow_statement": ("net_cash_from_operating_activities",),
+}
+
+# Upper bound on symbols bound into a single IN (...) list
+MAX_SYMBOLS_PER_QUERY = 500
+
+# Always returned, whatever column projection is requested
+KEY_COLUMNS = ("act_symbol", "date", "period")
+
+_IDENTIFIER_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+# Only these tables can be queried; the name is interpolated into SQL,
+# so it must never come straight from user input.
+STATEMENT_TABLES = (
+    "income_statement",
+    "balance_sheet_assets",
+    "balance_sheet_liabilities",
+    "balance_sheet_equity",
+    "cash_flow_statement",
+)
+
+
+# -----------------------------
+# Engine
+# -----------------------------
+@st.cache_resource
+def get_server_engine():
+    """
+    Returns the process-wide engine for the Dolt SQL server.
+
+    One pool is shared by every session and loader, so a cache miss reuses
+    an open connection instead of paying a fresh MySQL handshake.
+    pool_pre_ping drops connections the Dolt server closed while idle.
+    """
+    connect_args = {}
+    if make_url(EARNINGS_DB_URL).get_backend_name() == "mysql":
+        connect_args["connect_timeout"] = EARNINGS_DB_CONNECT_TIMEOUT
+
+    return create_engine(
+        EARNINGS_DB_URL,
+        pool_size=EARNINGS_DB_POOL_SIZE,
+        max_overflow=EARNINGS_DB_MAX_OVERFLOW,
+        pool_timeout=EARNINGS_DB_POOL_TIMEOUT,
+        pool_recycle=EARNINGS_DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+
+
+@st.cache_resource
+def _snapshot_engine():
+    return earnings_snapshot.snapshot_engine()
+
+
+@st.cache_data(ttl=EARNINGS_HEAD_CHECK_SECONDS, show_spinner=False)
+def _server_available():
+    try:
+        with get_server_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+
+
+def using_snapshot():
+    """True when reads are served by the SQLite snapshot instead of Dolt."""
+    if EARNINGS_DB_MODE == "snapshot":
+        return True
+    if EARNINGS_DB_MODE == "server" or not earnings_snapshot.snapshot_exists():
+        return False
+    return not _server_available()
+
+
+def get_engine():
+    """
+    Returns the engine reads should go to: the Dolt server, or the read-only
+    SQLite snapshot when the server is down (or EARNINGS_DB_MODE=snapshot).
+    Both accept the same queries.
+    """
+    return _snapshot_engine() if using_snapshot() else get_server_engine()
+
+
+@st.cache_resource
+def _statement_cache():
+    return FrameCache(max_entries=EARNINGS_CACHE_MAX_ENTRIES)
+
+
+# -----------------------------
+# Commit Tracking
+# -----------------------------
+@st.cache_data(ttl=EARNINGS_HEAD_CHECK_SECONDS, show_spinner=False)
+def _head_commit(snapshot):
+    try:
+        if snapshot:
+            with _snapshot_engine().connect() as conn:
+                return earnings_snapshot.snapshot_commit(conn)
+        with get_server_engine().connect() as conn:
+            return earnings_mirror.head_commit(conn)
+    except Exception:
+        return None
+
+
+def current_commit():
+    """
+    Returns a version tag for the earnings data currently being served.
+
+    This is the commit the Parquet mirror was synced to, the Dolt server's
+    HEAD commit, or the commit the SQLite snapshot was built from. If none
+    is known, a tag that changes once a day is used so cached frames still
+    expire.
+    """
+    manifest = earnings_mirror.read_manifest()
+    if manifest and manifest.get("commit"):
+        return manifest["commit"]
+    snapshot = using_snapshot()
+    commit = _head_commit(snapshot)
+    if commit:
+        return f"snapshot-{commit}" if snapshot else commit
+    return f"ttl-{int(time.time() // EARNINGS_CACHE_TTL)}"
+
+
+# -----------------------------
+# Queries
+# -----------------------------
+def period_value(statement_period):
+    """Maps the UI choice ("Annual" / "Quarterly") to the stored `period` value."""
+    return "Year" if statement_period == "Annual" else "Quarter"
+
+
+def _check_table(table):
+    if table not in STATEMENT_TABLES:
+        raise ValueError(f"Unknown statement table: {table}")
+
+
+def _check_columns(columns):
+    for column in columns:
+        if not _IDENTIFIER_RE.match(column):
+            raise ValueError(f"Invalid column name: {column}")
+
+
+def _query_shape(period=None, start=None, end=None, latest=None, columns=None):
+    """
+    Normalizes the optional filters of read_statements() into a hashable
+    tuple that is part of the cache key.
+    """
+    return (
+        period_value(period) if period else None,
+        pd.Timestamp(start).date() if start is not None else None,
+        pd.Timestamp(end).date() if end is not None else None,
+        int(latest) if latest else None,
+        tuple(dict.fromkeys(KEY_COLUMNS + tuple(columns))) if columns else None,
+    )
+
+
+def _fetch_statements(table, symbols, shape):
+    """
+    Runs one act_symbol IN (...) query per chunk of symbols, with the
+    period/date filters, the column list and the "latest N per symbol"
+    limit all evaluated by the database.
+    """
+    stored_period, start, end, latest, columns = shape
+    select = ", ".join(columns) if columns else "*"
+
+    conditions = ["act_symbol IN :symbols"]
+    params = {}
+    if stored_period:
+        conditions.append("period = :period")
+        params["period"] = stored_period
+    if start:
+        conditions.append("date >= :start")
+        params["start"] = start
+    if end:
+        conditions.append("date <= :end")
+        params["end"] = end
+    where = " AND ".join(conditions)
+
+    if latest:
+        params["latest"] = latest
+        sql = f"""
+            SELECT {select} FROM (
+                SELECT {select},
+                       ROW_NUMBER() OVER (PARTITION BY act_symbol ORDER BY date DESC) AS row_num
+                FROM {table}
+                WHERE {where}
+            ) ranked
+            WHERE row_num <= :latest
+            ORDER BY act_symbol, date DESC
+        """
+    else:
+        sql = f"""
+            SELECT {select} FROM {table}
+            WHERE {where}
+            ORDER BY act_symbol, date DESC
+        """
+    query = text(sql).bindparams(bindparam("symbols", expanding=True))
+
+    frames = []
+    with get_engine().connect() as conn:
+        for i in range(0, len(symbols), MAX_SYMBOLS_PER_QUERY):
+            chunk = symbols[i:i + MAX_SYMBOLS_PER_QUERY]
+            frames.append(pd.read_sql(query, con=conn, params={**params, "symbols": chunk}))
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    return df.drop(columns="row_num", errors="ignore")
+
+
+def read_statements(table, tickers, period=None, start=None, end=None, latest=None, columns=None):
+    """
+    Returns {TICKER: DataFrame} for one statement table, newest rows first.
+
+    Optional filters are pushed down to the database:
+      period   "Annual" or "Quarterly" (all periods when omitted)
+      start    earliest report date to include
+      end      latest report date to include
+      latest   keep only the N most recent rows per ticker
+      columns  metric columns to return (act_symbol, date and period are
+               always included)
+
+    Tickers already in the shared cache are served from memory. The others
+    are read from the local Parquet mirror when it has been synced, or else
+    fetched together in a single query; either way they are cached one
+    ticker at a time, so later single-ticker reads hit the cache too.
+    Tickers with no rows map to an empty frame.
+    """
+    _check_table(table)
+    if columns:
+        _check_columns(columns)
+    shape = _query_shape(period, start, end, latest, columns)
+    cache = _statement_cache()
+    commit = current_commit()
+
+    result = {}
+    missing = []
+    for symbol in dict.fromkeys(t.upper() for t in tickers):
+        df = cache.get((commit, table, symbol, shape))
+        if df is None:
+            missing.append(symbol)
+        else:
+            result[symbol] = df
+
+    if missing and earnings_mirror.has_table(table):
+        for symbol in missing:
+            df = earnings_mirror.read_symbol(table, symbol, *shape)
+            cache.put((commit, table, symbol, shape), df)
+            result[symbol] = df
+    elif missing:
+        fetched = _fetch_statements(table, missing, shape)
+        groups = dict(tuple(fetched.groupby("act_symbol", sort=False)))
+        for symbol in missing:
+            df = groups.get(symbol, fetched.iloc[0:0]).reset_index(drop=True)
+            cache.put((commit, table, symbol, shape), df)
+            result[symbol] = df
+
+    return result
+
+
+def read_statement(table, ticker, **filters):
+    """
+    Returns one statement table for a ticker, newest first. Accepts the same
+    filters as read_statements().
+    """
+    return read_statements(table, [ticker], **filters)[ticker.upper()]
+
+
+# -----------------------------
+# Ratio Panel
+# -----------------------------
+_PANEL_ALIASES = {
+    "income_statement": "i",
+    "balance_sheet_assets": "a",
+    "balance_sheet_liabilities": "l",
+    "balance_sheet_equity": "e",
+    "cash_flow_statement": "c",
+}
+
+
+def _fetch_ratio_panel(symbols, stored_period):
+    """
+    Joins the ratio fields of all five statements in the database.
+
+    Balance sheet rows are required (inner join); cash flow is optional.
+    """
+    columns = ", ".join(
+        f"{_PANEL_ALIASES[table]}.{field}"
+        for table, fields in RATIO_PANEL_FIELDS.items()
+        for field in fields
+    )
+    joins = "\n".join(
+        f"{'LEFT JOIN' if table == 'cash_flow_statement' else 'JOIN'} {table} {alias} "
+        f"ON {alias}.act_symbol = i.act_symbol AND {alias}.date = i.date AND {alias}.period = i.period"
+        for table, alias in _PANEL_ALIASES.items()
+        if alias != "i"
+    )
+    query = text(f"""
+        SELECT i.act_symbol, i.date, i.period, {columns}
+        FROM income_statement i
+        {joins}
+        WHERE i.act_symbol IN :symbols AND i.period = :period
+        ORDER BY i.act_symbol, i.date
+    """).bindparams(bindparam("symbols", expanding=True))
+
+    frames = []
+    with get_engine().connect() as conn:
+        for i in range(0, len(symbols), MAX_SYMBOLS_PER_QUERY):
+            chunk = symbols[i:i + MAX_SYMBOLS_PER_QUERY]
+            frames.append(pd.read_sql(query, con=conn, params={"symbols": chunk, "period": stored_period}))
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def _mirror_ratio_panel(symbol, stored_period):
+    """Same panel as _fetch_ratio_panel, assembled from the Parquet mirror."""
+    keys = list(KEY_COLUMNS)
+    panel = None
+    for table, fields in RATIO_PANEL_FIELDS.items():
+        df = earnings_mirror.read_symbol(table, symbol, stored_period, columns=keys + list(fields))
+        if panel is None:
+            panel = df
+        else:
+            how = "left" if table == "cash_flow_statement" else "inner"
+            panel = panel.merge(df, on=keys, how=how)
+    return panel.sort_values("date", ignore_index=True)
+
+
+def read_ratio_panels(tickers, statement_period):
+    """
+    Returns {TICKER: DataFrame} with one row per reporting date holding only
+    the statement fields the ratio views need, oldest first.
+
+    The five statements are joined by one SQL query for all uncached
+    tickers, and each ticker's panel is cached as a single compact frame.
+    """
+    stored_period = period_value(statement_period)
+    cache = _statement_cache()
+    commit = current_commit()
+
+    result = {}
+    missing = []
+    for symbol in dict.fromkeys(t.upper() for t in tickers):
+        df = cache.get((commit, "ratio_panel", stored_period, symbol))
+        if df is None:
+            missing.append(symbol)
+        else:
+            result[symbol] = df
+
+    if missing and all(earnings_mirror.has_table(t) for t in RATIO_PANEL_FIELDS):
+        fetched = {symbol: _mirror_ratio_panel(symbol, stored_period) for symbol in missing}
+    elif missing:
+        panel = _fetch_ratio_panel(missing, stored_period)
+        groups = dict(tuple(panel.groupby("act_symbol", sort=False)))
+        fetched = {
+            symbol: groups.get(symbol, panel.iloc[0:0]).reset_index(drop=True)
+            for symbol in missing
+        }
+    else:
+        fetched = {}
+
+    for symbol, df in fetched.items():
+        cache.put((commit, "ratio_panel", stored_period, symbol), df)
+        result[symbol] = df
+
+    return result
+
+
+def read_ratio_panel(ticker, statement_period):
+    return read_ratio_panels([ticker], statement_period)[ticker.upper()]
@@ -0,0 +1,225 @@
+# src/earnings_mirror.py
+"""
+Local Parquet mirror of the Dolt earnings database.
+
+Layout (one file per symbol, so a ticker read is a single local file scan):
+
+    <EARNINGS_MIRROR_DIR>/manifest.json
+    <EARNINGS_MIRROR_DIR>/<table>/<SYMBOL>.parquet
+
+Run after every `dolt pull` (the Dolt SQL server must be running):
+
+    python -m src.earnings_mirror
+
+The first run exports every table. Later runs ask Dolt which symbols changed
+between the last synced commit and HEAD (DOLT_DIFF table function) and
+rewrite only those files.
+"""
+import json
+import os
+import re
+import time
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import bindparam, text
+
+from src.data_paths import data_path
+
+EARNINGS_MIRROR_DIR = os.getenv("EARNINGS_MIRROR_DIR", data_path("earnings_mirror"))
+
+MIRRORED_TABLES = (
+    "income_statement",
+    "balance_sheet_assets",
+    "balance_sheet_liabilities",
+    "balance_sheet_equity",
+    "cash_flow_statement",
+)
+
+SYNC_BATCH_SIZE = 500
+
+# Dolt commit hashes are 32 base32 characters
+_COMMIT_RE = re.compile(r"^[0-9a-v]{32}$")
+
+
+# -----------------------------
+# Paths & Manifest
+# -----------------------------
+def _manifest_path():
+    return os.path.join(EARNINGS_MIRROR_DIR, "manifest.json")
+
+
+def _symbol_path(table, symbol):
+    return os.path.join(EARNINGS_MIRROR_DIR, table, f"{quote(symbol, safe='')}.parquet")
+
+
+def read_manifest():
+    """Returns the mirror manifest, or None if the mirror was never synced."""
+    try:
+        with open(_manifest_path(), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_manifest(manifest):
+    os.makedirs(EARNINGS_MIRROR_DIR, exist_ok=True)
+    tmp = _manifest_path() + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, _manifest_path())
+
+
+def has_table(table, manifest=None):
+    manifest = manifest if manifest is not None else read_manifest()
+    return bool(manifest) and table in manifest.get("tables", {})
+
+
+# -----------------------------
+# Reads
+# -----------------------------
+def read_symbol(table, symbol, stored_period=None, start=None, end=None, latest=None, columns=None):
+    """
+    Reads one ticker's rows from the mirror through a memory-mapped Arrow
+    file, newest first. Period and date filters are applied while scanning
+    the file and only the requested columns are decoded. Returns an empty
+    frame if the symbol has no rows.
+    """
+    path = _symbol_path(table, symbol.upper())
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=list(columns) if columns else None)
+
+    filters = []
+    if stored_period:
+        filters.append(("period", "=", stored_period))
+    if start:
+        filters.append(("date", ">=", start))
+    if end:
+        filters.append(("date", "<=", end))
+
+    df = pq.read_table(
+        path,
+        columns=list(columns) if columns else None,
+        filters=filters or None,
+        memory_map=True,
+    ).to_pandas()
+    df = df.sort_values("date", ascending=False, ignore_index=True)
+    return df.head(latest) if latest else df
+
+
+# -----------------------------
+# Writes
+# -----------------------------
+def _write_symbol(table, symbol, df):
+    path = _symbol_path(table, symbol)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+    os.replace(tmp, path)
+
+
+def _remove_symbol(table, symbol):
+    try:
+        os.remove(_symbol_path(table, symbol))
+    except FileNotFoundError:
+        pass
+
+
+def _export_symbols(conn, table, symbols):
+    """Re-exports the given symbols, removing files for symbols with no rows."""
+    query = text(f"""
+        SELECT * FROM {table}
+        WHERE act_symbol IN :symbols
+        ORDER BY act_symbol, date DESC
+    """).bindparams(bindparam("symbols", expanding=True))
+
+    for i in range(0, len(symbols), SYNC_BATCH_SIZE):
+        chunk = symbols[i:i + SYNC_BATCH_SIZE]
+        df = pd.read_sql(query, con=conn, params={"symbols": chunk})
+        groups = dict(tuple(df.groupby("act_symbol", sort=False)))
+        for symbol in chunk:
+            if symbol in groups:
+                _write_symbol(table, symbol, groups[symbol])
+            else:
+                _remove_symbol(table, symbol)
+
+
+# -----------------------------
+# Sync
+# -----------------------------
+def head_commit(conn):
+    return conn.execute(text("SELECT DOLT_HASHOF('HEAD')")).scalar()
+
+
+def _changed_symbols(conn, table, from_commit, to_commit):
+    for commit in (from_commit, to_commit):
+        if not _COMMIT_RE.match(commit):
+            raise ValueError(f"Not a Dolt commit hash: {commit}")
+    # DOLT_DIFF arguments must be literals; both hashes were validated above
+    rows = conn.execute(text(f"""
+        SELECT DISTINCT from_act_symbol, to_act_symbol
+        FROM DOLT_DIFF('{from_commit}', '{to_commit}', '{table}')
+    """)).fetchall()
+    return sorted({s for row in rows for s in row if s})
+
+
+def sync_mirror(engine, full=False):
+    """
+    Brings the mirror up to the Dolt HEAD commit.
+
+    Returns {table: number of symbols rewritten}.
+    """
+    manifest = read_manifest() or {"tables": {}}
+    summary = {}
+
+    with engine.connect() as conn:
+        head = head_commit(conn)
+
+        for table in MIRRORED_TABLES:
+            synced = manifest["tables"].get(table)
+
+            if synced == head and not full:
+                summary[table] = 0
+                continue
+
+            if synced and not full:
+                symbols = _changed_symbols(conn, table, synced, head)
+            else:
+                symbols = [
+                    row[0] for row in
+                    conn.execute(text(f"SELECT DISTINCT act_symbol FROM {table}")).fetchall()
+                ]
+
+            _export_symbols(conn, table, symbols)
+            summary[table] = len(symbols)
+
+            # Record progress per table so an interrupted sync resumes cleanly
+            manifest["tables"][table] = head
+            _write_manifest(manifest)
+
+    manifest["commit"] = head
+    manifest["synced_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    _write_manifest(manifest)
+    return summary
+
+
+def main():
+    import argparse
+
+    from src.earnings_db import get_server_engine
+
+    parser = argparse.ArgumentParser(description="Sync the local Parquet mirror of the earnings database.")
+    parser.add_argument("--full", action="store_true", help="re-export every symbol instead of the Dolt diff")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = sync_mirror(get_server_engine(), full=args.full)
+    for table, count in summary.items():
+        print(f"{table}: {count} symbols updated")
+    print(f"Mirror at {EARNINGS_MIRROR_DIR} synced in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# src/earnings_snapshot.py
+"""
+Read-only SQLite snapshot of the earnings database.
+
+The data layer (src/earnings_db.py) switches to this file automatically when
+the Dolt SQL server is not reachable, so the app starts without a daemon on
+laptops and in CI. Build or refresh it while the server is running:
+
+    python -m src.earnings_snapshot
+    python -m src.earnings_snapshot --symbols AAPL MSFT GOOG   # small fixture
+"""
+import os
+import time
+
+import pandas as pd
+from sqlalchemy import bindparam, create_engine, text
+
+from src.data_paths import data_path
+
+EARNINGS_SNAPSHOT_PATH = os.getenv("EARNINGS_SNAPSHOT_PATH", data_path("earnings_snapshot.sqlite"))
+
+SNAPSHOT_TABLES = (
+    "income_statement",
+    "balance_sheet_assets",
+    "balance_sheet_liabilities",
+    "balance_sheet_equity",
+    "cash_flow_statement",
+)
+
+EXPORT_CHUNK_ROWS = 50000
+
+
+def snapshot_exists(path=EARNINGS_SNAPSHOT_PATH):
+    return os.path.exists(path)
+
+
+def snapshot_engine(path=EARNINGS_SNAPSHOT_PATH):
+    """Opens the snapshot read-only; several sessions may read it at once."""
+    return create_engine(f"sqlite:///file:{os.path.abspath(path)}?mode=ro&uri=true")
+
+
+def snapshot_commit(conn):
+    """Returns the Dolt commit the snapshot was built from."""
+    return conn.execute(text("SELECT value FROM snapshot_meta WHERE key = 'commit'")).scalar()
+
+
+# -----------------------------
+# Build
+# -----------------------------
+def _copy_table(source_conn, target_conn, table, symbols=None):
+    if symbols:
+        query = text(f"SELECT * FROM {table} WHERE act_symbol IN :symbols").bindparams(
+            bindparam("symbols", expanding=True)
+        )
+        params = {"symbols": list(symbols)}
+    else:
+        query = text(f"SELECT * FROM {table}")
+        params = {}
+
+    rows = 0
+    for chunk in pd.read_sql(query, con=source_conn, params=params, chunksize=EXPORT_CHUNK_ROWS):
+        chunk.to_sql(table, target_conn, if_exists="append", index=False)
+        rows += len(chunk)
+
+    if not rows:
+        # No rows for these symbols: still create the (empty) table from the
+        # source columns, so reads return nothing instead of "no such table"
+        empty = pd.read_sql(text(f"SELECT * FROM {table} LIMIT 0"), con=source_conn)
+        empty.to_sql(table, target_conn, if_exists="append", index=False)
+
+    # Matches the data layer's lookups: symbol, then period, then date range
+    target_conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_symbol_period_date "
+        f"ON {table} (act_symbol, period, date)"
+    ))
+    return rows
+
+
+def build_snapshot(source_engine, path=EARNINGS_SNAPSHOT_PATH, symbols=None):
+    """
+    Copies the statement tables from the Dolt server into a new SQLite file
+    and swaps it in atomically. Returns {table: rows copied}.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    target_engine = create_engine(f"sqlite:///{os.path.abspath(tmp)}")
+    summary = {}
+    with source_engine.connect() as source_conn, target_engine.begin() as target_conn:
+        source_conn.execution_options(stream_results=True)
+        commit = source_conn.execute(text("SELECT DOLT_HASHOF('HEAD')")).scalar()
+        for table in SNAPSHOT_TABLES:
+            summary[table] = _copy_table(source_conn, target_conn, table, symbols)
+
+        target_conn.execute(text("CREATE TABLE snapshot_meta (key TEXT PRIMARY KEY, value TEXT)"))
+        target_conn.execute(
+            text("INSERT INTO snapshot_meta (key, value) VALUES (:key, :value)"),
+            [
+                {"key": "commit", "value": commit},
+                {"key": "built_at", "value": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            ],
+        )
+    target_engine.dispose()
+
+    os.replace(tmp, path)
+    return summary
+
+
+def main():
+    import argparse
+
+    from src.earnings_db import get_server_engine
+
+    parser = argparse.ArgumentParser(description="Build the read-only SQLite snapshot of the earnings database.")
+    parser.add_argument("--output", default=EARNINGS_SNAPSHOT_PATH, help="snapshot file to write")
+    parser.add_argument("--symbols", nargs="*", help="only copy these tickers (e.g. for a test fixture)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    symbols = [s.upper() for s in args.symbols] if args.symbols else None
+    summary = build_snapshot(get_server_engine(), path=args.output, symbols=symbols)
+    for table, rows in summary.items():
+        print(f"{table}: {rows} rows")
+    print(f"Snapshot written to {args.output} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import streamlit as st
-from fredapi import Fred
 import pandas as pd
 import plotly.express as px
 from datetime import datetime, timedelta
@@ -7,13 +6,13 @@ from typing import List, Tuple, Dict, Any
 
 # CRITICAL FIX: Import the Gemini client getter from ai_functions.py
 from src.ai_functions import get_gemini_client 
-from google import genai # Added back because it's required for genai types in the function below
-from google.genai import types # Added back because it's required for types in the function below
 
 # --- FRED UTILS ---
 @st.cache_resource
 def get_fred_client():
     """Initializes and returns the FRED API client."""
+    from fredapi import Fred  # imported on first use, not with the landing page
+
     try:
         # FRED_API_KEY is retrieved from .streamlit/secrets.toml
         return Fred(api_key=st.secrets["FRED_API_KEY"])
@@ -124,6 +123,8 @@ def synthesize_indicator_conclusion(
         f"Data to Analyze:\n{data_string}"
     )
 
+    from google.genai import types  # imported on first use, not with the landing page
+
     try:
         # 4. CALL GEMINI API using the correct GEMINI client
         response = _gemini_client.models.generate_content(
@@ -0,0 +1,71 @@
+# src/figure_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+FIGURE_CACHE_MAX_ENTRIES = int(os.getenv("FIGURE_CACHE_MAX_ENTRIES", "256"))
+
+
+def fingerprint(*objects):
+    """
+    Content hash of the data behind a chart. DataFrames and Series are
+    hashed row-wise with pandas' vectorized hash (index included); anything
+    else by its repr.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for obj in objects:
+        if isinstance(obj, pd.DataFrame):
+            digest.update(repr(list(obj.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        elif isinstance(obj, pd.Series):
+            digest.update(repr(obj.name).encode())
+            digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        else:
+            digest.update(repr(obj).encode())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """
+    Thread-safe LRU of built Plotly figures. Figures are shared between
+    sessions, so callers must not modify a figure they got from the cache.
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        fig = build()
+        with self._lock:
+            self._entries[key] = fig
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+
+def cached_figure(key, build):
+    """
+    Returns the figure for `key`, calling `build()` only on a miss. Keys are
+    tuples like ("price", fingerprint(df), chart_type, time_range, theme).
+    """
+    return get_figure_cache().get_or_build(key, build)
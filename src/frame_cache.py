@@ -0,0 +1,43 @@
+# src/frame_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class FrameCache:
+    """
+    Thread-safe LRU of DataFrames shared by every session in the process.
+
+    Unlike st.cache_data, entries can be filled in bulk (e.g. one query that
+    returns many tickers) and read back one key at a time. Frames are copied
+    on the way in and out so callers can mutate what they get.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, df = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return df.copy()
+
+    def put(self, key, df):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), df.copy())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,193 @@
+# src/growth_analytics.py
+"""
+Growth analytics over DoltHub statement rows (act_symbol, date, period,
+metrics...) for any number of tickers.
+
+`build_growth_panel` computes, for every metric at once:
+
+- YoY: annual vs prior year, and each quarter vs the same quarter a year earlier
+- QoQ: each quarter vs the previous quarter
+- TTM: sum of the last four quarters (flow statements only)
+- CAGR over 3 and 5 years from annual rows
+
+All frames are indexed by (act_symbol, date). A comparison is only made when
+the two filings are the expected distance apart (so a missing quarter gives
+NaN instead of a wrong "YoY"). Growth is (current - base) / |base|, so moving
+from a loss to a smaller loss is positive growth; a zero or missing base
+gives NaN.
+
+For flow statements (income, cash flow), a fiscal Q4 that was only filed as
+part of the annual report is derived as annual minus Q1-Q3.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+META_COLUMNS = ("act_symbol", "date", "period")
+CAGR_YEARS = (3, 5)
+
+DAY = pd.Timedelta(days=1)
+# Allowed distance between filings being compared, in days
+YEAR_GAP = (330, 400)
+QUARTER_GAP = (60, 120)
+TTM_SPAN = (240, 300)  # first to last of four consecutive quarter ends
+Q4_TOLERANCE = pd.Timedelta(days=20)
+
+
+def _frame(df, stored_period, metrics):
+    rows = df[df["period"] == stored_period]
+    out = rows.set_index(["act_symbol", "date"])[metrics].apply(pd.to_numeric, errors="coerce")
+    out = out[~out.index.duplicated(keep="last")]
+    return out.sort_index().astype(np.float64)
+
+
+def _dates(frame):
+    return pd.Series(frame.index.get_level_values("date"), index=frame.index)
+
+
+def _gap_ok(frame, periods, gap):
+    """True where the row `periods` earlier (same ticker) is `gap` days back."""
+    dates = _dates(frame)
+    days = (dates - dates.groupby(level="act_symbol").shift(periods)) / DAY
+    return days.between(*gap).to_numpy()[:, None]
+
+
+def _growth(frame, periods, gap):
+    base = frame.groupby(level="act_symbol").shift(periods)
+    curr, prev = frame.to_numpy(), base.to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (curr - prev) / np.abs(prev) * 100
+    change[(prev == 0) | ~_gap_ok(frame, periods, gap)] = np.nan
+    return pd.DataFrame(change, index=frame.index, columns=frame.columns)
+
+
+def _cagr(annual, years):
+    base = annual.groupby(level="act_symbol").shift(years)
+    curr, prev = annual.to_numpy(), base.to_numpy()
+    gap = (years * 365 - 40, years * 365 + 40)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = (np.power(curr / prev, 1 / years) - 1) * 100
+    rate[(curr <= 0) | (prev <= 0) | ~_gap_ok(annual, years, gap)] = np.nan
+    return pd.DataFrame(rate, index=annual.index, columns=annual.columns)
+
+
+def derive_q4(annual, quarterly):
+    """
+    Adds missing fiscal Q4 rows: each quarter is assigned to the next annual
+    report of the same ticker (merge_asof), and where a fiscal year has
+    exactly Q1-Q3 on file, Q4 = annual - sum(Q1..Q3) dated at year end.
+    Returns (quarterly with Q4 rows, boolean Series marking derived rows).
+    """
+    if annual.empty or quarterly.empty:
+        return quarterly, pd.Series(False, index=quarterly.index)
+
+    years = annual.index.to_frame(index=False).rename(columns={"date": "year_end"})
+    years["year_date"] = years["year_end"]
+    quarters = quarterly.index.to_frame(index=False)
+    quarters["row"] = np.arange(len(quarters))
+
+    assigned = pd.merge_asof(
+        quarters.sort_values("date"),
+        years.sort_values("year_date"),
+        left_on="date",
+        right_on="year_date",
+        by="act_symbol",
+        direction="forward",
+        tolerance=pd.Timedelta(days=380),
+    ).dropna(subset=["year_end"])
+    # A quarter within Q4_TOLERANCE of the year end is that year's Q4
+    assigned["is_q4"] = (assigned["year_end"] - assigned["date"]) <= Q4_TOLERANCE
+
+    per_year = assigned.groupby(["act_symbol", "year_end"]).agg(
+        quarters=("row", "size"), has_q4=("is_q4", "any")
+    )
+    missing = per_year[(per_year["quarters"] == 3) & ~per_year["has_q4"]].index
+    if missing.empty:
+        return quarterly, pd.Series(False, index=quarterly.index)
+
+    key = pd.MultiIndex.from_frame(assigned[["act_symbol", "year_end"]])
+    keep = key.isin(missing)
+    sums = (
+        quarterly.iloc[assigned.loc[keep, "row"].to_numpy()]
+        .set_axis(key[keep])
+        .groupby(level=[0, 1])
+        .sum(min_count=3)
+    )
+    q4 = annual.reindex(missing) - sums.reindex(missing).to_numpy()
+    q4.index = q4.index.set_names(["act_symbol", "date"])
+
+    filled = pd.concat([quarterly, q4]).sort_index()
+    derived = pd.Series(filled.index.isin(q4.index), index=filled.index)
+    return filled, derived
+
+
+class GrowthPanel:
+    """Growth measures of one statement for a set of tickers."""
+
+    def __init__(self, annual, quarterly, derived_q4, yoy, quarterly_yoy, qoq, ttm, cagr):
+        self.annual = annual
+        self.quarterly = quarterly
+        self.derived_q4 = derived_q4
+        self.yoy = yoy
+        self.quarterly_yoy = quarterly_yoy
+        self.qoq = qoq
+        self.ttm = ttm
+        self.cagr = cagr
+
+    def for_ticker(self, frame, ticker):
+        """Rows of one of the frames above for `ticker`, indexed by date."""
+        if ticker not in frame.index.get_level_values("act_symbol"):
+            return frame.iloc[0:0].droplevel("act_symbol")
+        return frame.xs(ticker, level="act_symbol")
+
+    def latest(self, frame):
+        """Last row per ticker (ignoring all-NaN rows): ticker x metric."""
+        return frame.dropna(how="all").groupby(level="act_symbol").tail(1).droplevel("date")
+
+
+def build_growth_panel(df, metrics=None, flow=True):
+    """
+    Computes every growth measure for every metric of a statement frame in
+    one pass. `flow=False` (balance sheet) skips TTM and Q4 derivation.
+    """
+    df = df.assign(
+        date=pd.to_datetime(df["date"], errors="coerce"),
+        period=df["period"].astype(str).str.upper(),
+    ).dropna(subset=["date"])
+    if metrics is None:
+        metrics = [
+            c for c in df.columns
+            if c not in META_COLUMNS and pd.api.types.is_numeric_dtype(df[c])
+        ]
+    metrics = list(metrics)
+
+    annual = _frame(df, "YEAR", metrics)
+    quarterly = _frame(df, "QUARTER", metrics)
+    if flow:
+        quarterly, derived = derive_q4(annual, quarterly)
+    else:
+        derived = pd.Series(False, index=quarterly.index)
+
+    if flow and not quarterly.empty:
+        ttm = quarterly.groupby(level="act_symbol").rolling(4, min_periods=4).sum().droplevel(0)
+        ttm = ttm.reindex(quarterly.index)
+        ttm.loc[~_gap_ok(quarterly, 3, TTM_SPAN)[:, 0]] = np.nan
+    else:
+        ttm = quarterly.iloc[0:0]
+
+    return GrowthPanel(
+        annual=annual,
+        quarterly=quarterly,
+        derived_q4=derived,
+        yoy=_growth(annual, 1, YEAR_GAP),
+        quarterly_yoy=_growth(quarterly, 4, YEAR_GAP),
+        qoq=_growth(quarterly, 1, QUARTER_GAP),
+        ttm=ttm,
+        cagr={years: _cagr(annual, years) for years in CAGR_YEARS},
+    )
+
+
+@st.cache_resource(max_entries=128)
+def cached_growth_panel(statement, data_fingerprint, _df, metrics=None, flow=True):
+    """Memoized per (statement, data fingerprint, metrics); the frame itself is not hashed."""
+    return build_growth_panel(_df, list(metrics) if metrics else None, flow)
@@ -0,0 +1,104 @@
+# src/import_budget.py
+"""
+Import-time budget report for the modules each page loads.
+
+    python -m src.import_budget
+
+Each module is imported in a fresh interpreter with `python -X importtime`
+(so earlier imports cannot hide its cost) and compared with its budget.
+Exits with status 1 when any module is over budget, so it can run in CI.
+
+The landing path (what finance_dashboard.py imports to render the default
+Dashboard page) is also measured as a whole, and must not pull in any of
+LAZY_MODULES: those are imported inside the functions that use them.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed per module, in milliseconds
+IMPORT_BUDGETS_MS = {
+    "streamlit": 1500,
+    "pages.single_stock.utils": 3000,
+    "pages.single_stock.single_stock_charts": 3500,
+    "views.dashboard_macro": 5000,
+    "views.dashboard_ai_news": 5000,
+}
+
+# Modules finance_dashboard.py imports to render its default (Dashboard) page
+LANDING_PATH = ("streamlit", "views.dashboard_ai_news", "views.dashboard_macro")
+LANDING_BUDGET_MS = 5000
+
+# Slow libraries that must only load when a feature is actually used
+LAZY_MODULES = ("playwright", "google.genai", "fredapi")
+
+
+def _import_times(modules):
+    """{module: cumulative ms} for everything imported by `import <modules>` in a clean interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else f"cannot import {modules}")
+
+    # Lines look like: "import time:   1234 |    56789 |   package.module"
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = [f.strip() for f in line[len("import time:"):].split("|")]
+        if len(fields) == 3 and fields[1].isdigit():
+            times[fields[2]] = int(fields[1]) / 1000
+    return times
+
+
+def measure_import_ms(module):
+    """Returns the cumulative import time of `module` in a clean interpreter."""
+    times = _import_times([module])
+    if module not in times:
+        raise RuntimeError(f"no importtime entry for {module}")
+    return times[module]
+
+
+def measure_landing():
+    """(total ms, lazy modules loaded) for the landing page's imports."""
+    times = _import_times(LANDING_PATH)
+    total = sum(times.get(module, 0) for module in LANDING_PATH)
+    loaded = [lazy for lazy in LAZY_MODULES if any(m == lazy or m.startswith(lazy + ".") for m in times)]
+    return total, loaded
+
+
+def main():
+    over_budget = False
+    print(f"{'module':<42}{'import ms':>10}{'budget ms':>11}")
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        try:
+            ms = measure_import_ms(module)
+        except RuntimeError as e:
+            print(f"{module:<42}{'error':>10}{budget:>11}  {e}")
+            over_budget = True
+            continue
+        flag = "  OVER" if ms > budget else ""
+        over_budget = over_budget or ms > budget
+        print(f"{module:<42}{ms:>10.0f}{budget:>11}{flag}")
+
+    try:
+        ms, loaded = measure_landing()
+    except RuntimeError as e:
+        print(f"{'landing page':<42}{'error':>10}{LANDING_BUDGET_MS:>11}  {e}")
+        sys.exit(1)
+    flag = "  OVER" if ms > LANDING_BUDGET_MS else ""
+    if loaded:
+        flag += "  loads " + ", ".join(loaded)
+    over_budget = over_budget or ms > LANDING_BUDGET_MS or bool(loaded)
+    print(f"{'landing page':<42}{ms:>10.0f}{LANDING_BUDGET_MS:>11}{flag}")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# src/indicators.py
+"""
+Vectorized technical indicators over an OHLCV frame (DatetimeIndex, columns
+Open/High/Low/Close/Volume as returned by yfinance).
+
+Every indicator is computed by `compute(hist, start, prev, **params)`, which
+returns rows for `hist.iloc[start:]`. `hist` may begin with `lookback` older
+bars (for rolling windows), and `prev` is the last row of the previous
+result (the state exponential averages continue from). With start=0 and
+prev=None this is a normal full computation; `IndicatorEngine` uses the same
+function to extend a memoized result when bars are appended, so the update
+costs O(new bars) and matches a full recomputation.
+
+Columns starting with "_" carry state between updates and are not returned.
+"""
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+INDICATOR_CACHE_MAX_ENTRIES = int(os.getenv("INDICATOR_CACHE_MAX_ENTRIES", "512"))
+
+Indicator = namedtuple("Indicator", ["compute", "defaults", "lookback", "overlay"])
+
+
+def _ewm(values, alpha, seed=None):
+    """adjust=False exponential average of a Series, continuing from `seed`."""
+    if seed is None or pd.isna(seed):
+        return values.ewm(alpha=alpha, adjust=False).mean()
+    seeded = pd.concat([pd.Series([seed]), values.reset_index(drop=True)])
+    out = seeded.ewm(alpha=alpha, adjust=False).mean().iloc[1:]
+    out.index = values.index
+    return out
+
+
+def _prev(prev, column):
+    return None if prev is None else prev[column]
+
+
+# -----------------------------
+# Indicators
+# -----------------------------
+def sma(hist, start, prev, window=20):
+    return pd.DataFrame({"SMA": hist["Close"].rolling(window).mean().iloc[start:]})
+
+
+def ema(hist, start, prev, span=20):
+    return pd.DataFrame({"EMA": _ewm(hist["Close"].iloc[start:], 2 / (span + 1), _prev(prev, "EMA"))})
+
+
+def rsi(hist, start, prev, period=14):
+    """Wilder's RSI (exponential averages with alpha = 1/period)."""
+    delta = hist["Close"].diff().iloc[start:]
+    gain = _ewm(delta.clip(lower=0), 1 / period, _prev(prev, "_gain"))
+    loss = _ewm(-delta.clip(upper=0), 1 / period, _prev(prev, "_loss"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100 - 100 / (1 + gain / loss)
+    return pd.DataFrame({"RSI": value, "_gain": gain, "_loss": loss})
+
+
+def macd(hist, start, prev, fast=12, slow=26, signal=9):
+    close = hist["Close"].iloc[start:]
+    fast_ema = _ewm(close, 2 / (fast + 1), _prev(prev, "_fast"))
+    slow_ema = _ewm(close, 2 / (slow + 1), _prev(prev, "_slow"))
+    line = fast_ema - slow_ema
+    signal_line = _ewm(line, 2 / (signal + 1), _prev(prev, "Signal"))
+    return pd.DataFrame({
+        "MACD": line,
+        "Signal": signal_line,
+        "Histogram": line - signal_line,
+        "_fast": fast_ema,
+        "_slow": slow_ema,
+    })
+
+
+def bollinger(hist, start, prev, window=20, num_std=2.0):
+    rolling = hist["Close"].rolling(window)
+    mid, std = rolling.mean().iloc[start:], rolling.std(ddof=0).iloc[start:]
+    return pd.DataFrame({"Middle": mid, "Upper": mid + num_std * std, "Lower": mid - num_std * std})
+
+
+def atr(hist, start, prev, period=14):
+    """Average True Range with Wilder smoothing."""
+    prev_close = hist["Close"].shift(1)
+    true_range = np.fmax.reduce([
+        (hist["High"] - hist["Low"]).to_numpy(),
+        (hist["High"] - prev_close).abs().to_numpy(),
+        (hist["Low"] - prev_close).abs().to_numpy(),
+    ])
+    true_range = pd.Series(true_range, index=hist.index).iloc[start:]
+    return pd.DataFrame({"ATR": _ewm(true_range, 1 / period, _prev(prev, "ATR"))})
+
+
+def vwap(hist, start, prev, window=20):
+    """Rolling volume-weighted average of the typical price over `window` bars."""
+    typical = (hist["High"] + hist["Low"] + hist["Close"]) / 3
+    volume = hist["Volume"]
+    value = (typical * volume).rolling(window).sum() / volume.rolling(window).sum()
+    return pd.DataFrame({"VWAP": value.iloc[start:]})
+
+
+INDICATORS = {
+    "SMA": Indicator(sma, {"window": 20}, lambda p: p["window"] - 1, True),
+    "EMA": Indicator(ema, {"span": 20}, lambda p: 0, True),
+    "Bollinger Bands": Indicator(bollinger, {"window": 20, "num_std": 2.0}, lambda p: p["window"] - 1, True),
+    "VWAP": Indicator(vwap, {"window": 20}, lambda p: p["window"] - 1, True),
+    "RSI": Indicator(rsi, {"period": 14}, lambda p: 1, False),
+    "MACD": Indicator(macd, {"fast": 12, "slow": 26, "signal": 9}, lambda p: 0, False),
+    "ATR": Indicator(atr, {"period": 14}, lambda p: 1, False),
+}
+
+
+def volume_profile(hist, bins=40):
+    """
+    Traded volume per price bucket over `hist` (typical price of each bar).
+    Returns a frame with the bucket mid price and its volume.
+    """
+    if hist.empty:
+        return pd.DataFrame(columns=["Price", "Volume"])
+    typical = ((hist["High"] + hist["Low"] + hist["Close"]) / 3).to_numpy()
+    volume, edges = np.histogram(typical, bins=bins, weights=hist["Volume"].to_numpy())
+    return pd.DataFrame({"Price": (edges[:-1] + edges[1:]) / 2, "Volume": volume})
+
+
+# -----------------------------
+# Memoized Engine
+# -----------------------------
+def _public(result):
+    return result[[c for c in result.columns if not c.startswith("_")]]
+
+
+class IndicatorEngine:
+    """
+    Memoizes indicator results per (ticker, interval, indicator, params).
+    When the same history comes back with bars appended, only the new bars
+    are computed; any other change (wider window, re-adjusted prices)
+    triggers a full computation.
+    """
+
+    def __init__(self, max_entries=INDICATOR_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _appended_from(entry, hist):
+        """Number of bars `hist` shares with the memoized result, or None."""
+        result, last_close = entry
+        n = len(result)
+        if n == 0 or n > len(hist):
+            return None
+        if hist.index[0] != result.index[0] or hist.index[n - 1] != result.index[-1]:
+            return None
+        close = hist["Close"].iloc[n - 1]
+        if not (close == last_close or (pd.isna(close) and pd.isna(last_close))):
+            return None
+        return n
+
+    def compute(self, ticker, interval, name, hist, **params):
+        spec = INDICATORS[name]
+        params = {**spec.defaults, **params}
+        key = (ticker, interval, name, tuple(sorted(params.items())))
+
+        entry = self._get(key)
+        shared = self._appended_from(entry, hist) if entry is not None else None
+
+        if shared is None:
+            result = spec.compute(hist, 0, None, **params)
+        elif shared == len(hist):
+            return _public(entry[0])
+        else:
+            lookback = min(spec.lookback(params), shared)
+            window = hist.iloc[shared - lookback:]
+            tail = spec.compute(window, lookback, entry[0].iloc[-1], **params)
+            result = pd.concat([entry[0], tail])
+
+        self._put(key, (result, hist["Close"].iloc[-1] if len(hist) else np.nan))
+        return _public(result)
+
+
+@st.cache_resource
+def get_indicator_engine():
+    return IndicatorEngine()
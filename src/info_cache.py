@@ -0,0 +1,136 @@
+# src/info_cache.py
+"""
+Disk-backed cache of Yahoo Finance company info (`Ticker.info`).
+
+    <INFO_CACHE_DIR>/<SYMBOL>.json
+
+Only the fields the overview cards read are kept, so entries are a few
+hundred bytes and load in well under a millisecond. Entries survive
+restarts; once older than INFO_CACHE_TTL they are still served while a
+background thread fetches a fresh copy.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote
+
+import streamlit as st
+
+from src.data_paths import data_path
+
+INFO_CACHE_DIR = os.getenv("INFO_CACHE_DIR", data_path("info"))
+INFO_CACHE_TTL = int(os.getenv("INFO_CACHE_TTL", "86400"))
+INFO_REFRESH_WORKERS = int(os.getenv("INFO_REFRESH_WORKERS", "2"))
+
+# Fields read by the overview cards (pages/single_stock/single_stock_overview.py)
+INFO_FIELDS = (
+    "shortName",
+    "sector",
+    "industry",
+    "country",
+    "marketCap",
+    "currentPrice",
+    "beta",
+    "trailingPE",
+    "priceToSalesTrailing12Months",
+    "priceToBook",
+)
+
+
+def trim_info(info):
+    return {key: info[key] for key in INFO_FIELDS if info.get(key) is not None}
+
+
+class InfoCache:
+    """
+    Per-ticker info cache: memory, then disk, then `fetch(symbol)`. Stale
+    entries are returned immediately and refreshed in the background, at
+    most one refresh per symbol at a time.
+    """
+
+    def __init__(self, directory=INFO_CACHE_DIR, ttl=INFO_CACHE_TTL, workers=INFO_REFRESH_WORKERS):
+        self.directory = directory
+        self.ttl = ttl
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="info-refresh")
+
+    def _path(self, symbol):
+        return os.path.join(self.directory, f"{quote(symbol, safe='')}.json")
+
+    def _read(self, symbol):
+        try:
+            with open(self._path(symbol), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _store(self, symbol, info):
+        entry = {"fetched_at": time.time(), "info": trim_info(info)}
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(symbol) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._path(symbol))
+        with self._lock:
+            self._entries[symbol] = entry
+        return entry
+
+    def _refresh(self, symbol, fetch):
+        try:
+            self._store(symbol, fetch(symbol))
+        except Exception:
+            pass  # keep serving the stale entry; the next read retries
+        finally:
+            with self._lock:
+                self._refreshing.discard(symbol)
+
+    def names(self):
+        """[(symbol, shortName)] of every entry on disk."""
+        entries = []
+        try:
+            files = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for file in files:
+            if not file.endswith(".json"):
+                continue
+            symbol = unquote(file[:-len(".json")])
+            entry = self._read(symbol)
+            if entry is not None:
+                entries.append((symbol, entry["info"].get("shortName", "")))
+        return entries
+
+    def get(self, symbol, fetch):
+        """Returns the trimmed info dict, or {"error": ...} if it cannot be loaded."""
+        symbol = symbol.upper()
+        with self._lock:
+            entry = self._entries.get(symbol)
+        if entry is None:
+            entry = self._read(symbol)
+            if entry is not None:
+                with self._lock:
+                    self._entries[symbol] = entry
+
+        if entry is None:
+            try:
+                return dict(self._store(symbol, fetch(symbol))["info"])
+            except Exception as e:
+                return {"error": str(e)}
+
+        if time.time() - entry.get("fetched_at", 0) > self.ttl:
+            with self._lock:
+                start = symbol not in self._refreshing
+                self._refreshing.add(symbol)
+            if start:
+                self._pool.submit(self._refresh, symbol, fetch)
+        return dict(entry["info"])
+
+
+@st.cache_resource
+def get_info_cache():
+    """One cache (and refresh pool) per process."""
+    return InfoCache()
@@ -0,0 +1,53 @@
+# src/period_cube.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+FREQUENCIES = {
+    "Annual": ("YEAR", "Y"),
+    "Quarterly": ("QUARTER", "Q"),
+}
+
+
+class PeriodCube:
+    """
+    All metrics of one statement summed per period, for both frequencies:
+    {frequency: (period labels, float matrix [period x metric])}. Built
+    with one groupby per frequency; reading a metric is an array lookup.
+
+    `period_col` (e.g. DoltHub's "period" = Year/Quarter) selects the rows of
+    each frequency; without it every row is used for both.
+    """
+
+    def __init__(self, df, metrics, date_col="date", period_col=None):
+        self.metrics = list(metrics)
+        self._columns = {metric: j for j, metric in enumerate(self.metrics)}
+        self._tables = {}
+
+        dates = pd.to_datetime(df[date_col], errors="coerce")
+        values = df[self.metrics].apply(pd.to_numeric, errors="coerce")
+        stored_periods = df[period_col].astype(str).str.upper() if period_col in df.columns else None
+
+        for frequency, (stored, freq_code) in FREQUENCIES.items():
+            mask = dates.notna()
+            if stored_periods is not None:
+                mask &= stored_periods == stored
+            labels = dates[mask].dt.to_period(freq_code).astype(str)
+            grouped = values[mask].groupby(labels.to_numpy()).sum(min_count=1)
+            self._tables[frequency] = (grouped.index.to_numpy(), grouped.to_numpy(dtype=np.float64))
+
+    def series(self, frequency, metric):
+        """(periods, values) of one metric, skipping periods without data."""
+        periods, matrix = self._tables[frequency]
+        column = matrix[:, self._columns[metric]]
+        present = ~np.isnan(column)
+        return periods[present].tolist(), column[present].tolist()
+
+
+@st.cache_resource(max_entries=64)
+def get_period_cube(ticker, data_fingerprint, _df, metrics, period_col=None):
+    """
+    One cube per (ticker, data fingerprint, metrics); the frame itself is
+    not hashed (leading underscore), the fingerprint stands in for it.
+    """
+    return PeriodCube(_df, metrics, period_col=period_col)
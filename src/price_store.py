@@ -0,0 +1,227 @@
+# src/price_store.py
+"""
+Persistent per-symbol OHLCV store (Parquet) with incremental refresh.
+
+    <PRICE_STORE_DIR>/<interval>/<SYMBOL>.parquet
+
+A symbol is downloaded once for the widest period requested so far. Later
+refreshes only fetch bars since the last stored date. If those bars carry
+a new dividend or split, or the overlapping bar no longer matches (Yahoo
+re-adjusted the history), the whole window is downloaded again.
+"""
+import json
+import logging
+import os
+import time
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.data_paths import data_path
+
+logger = logging.getLogger(__name__)
+
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", data_path("prices"))
+
+# Stored bars are trusted for this long before the tail is re-fetched
+PRICE_TAIL_REFRESH_SECONDS = int(os.getenv("PRICE_TAIL_REFRESH_SECONDS", "3600"))
+
+# Only bar sizes of a day or more are stored; intraday data is always live
+STORED_INTERVALS = ("1d", "5d", "1wk", "1mo", "3mo")
+
+# Calendar length of each yfinance period, used to compare and slice windows
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+    "max": None,
+}
+
+_META_KEY = b"price_store"
+_ACTION_COLUMNS = ("Dividends", "Stock Splits")
+
+
+# -----------------------------
+# Periods
+# -----------------------------
+def period_start(period, tz=None):
+    """Earliest timestamp a period covers (None for "max")."""
+    now = pd.Timestamp.now(tz=tz).normalize()
+    if period == "ytd":
+        return now.replace(month=1, day=1)
+    offset = PERIOD_OFFSETS.get(period)
+    return now - offset if offset is not None else None
+
+
+def period_covers(stored_period, period):
+    """True if a window downloaded for `stored_period` contains `period`."""
+    if stored_period == "max":
+        return True
+    if period == "max":
+        return False
+    stored_start, start = period_start(stored_period), period_start(period)
+    return stored_start is not None and start is not None and stored_start <= start
+
+
+def widest(*periods):
+    """The period among `periods` that covers all the others."""
+    best = periods[0]
+    for period in periods[1:]:
+        if not period_covers(best, period):
+            best = period
+    return best
+
+
+def slice_period(hist, period):
+    """Returns the bars of `hist` that fall inside `period`."""
+    if hist.empty or not isinstance(hist.index, pd.DatetimeIndex):
+        return hist
+    start = period_start(period, tz=hist.index.tz)
+    return hist if start is None else hist.loc[hist.index >= start]
+
+
+# -----------------------------
+# Files
+# -----------------------------
+def is_stored_interval(interval):
+    return interval in STORED_INTERVALS
+
+
+def _path(symbol, interval):
+    return os.path.join(PRICE_STORE_DIR, interval, f"{quote(symbol.upper(), safe='')}.parquet")
+
+
+def read(symbol, interval):
+    """
+    Returns (history, meta) from disk, or (None, None) if not stored. The
+    covered period is also kept in history.attrs["period"].
+    """
+    path = _path(symbol, interval)
+    if not os.path.exists(path):
+        return None, None
+    try:
+        table = pq.read_table(path, memory_map=True)
+        meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b"{}"))
+        hist = table.to_pandas()
+        hist.attrs["period"] = meta.get("period")
+        return hist, meta
+    except Exception:
+        return None, None
+
+
+def save(symbol, interval, period, hist):
+    """Writes a full window and records which period it covers."""
+    if hist is None:
+        return
+    hist.attrs["period"] = period
+    if hist.empty:
+        return
+    path = _path(symbol, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(hist)
+    meta = {"period": period, "fetched_at": time.time()}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: json.dumps(meta).encode()})
+    tmp = path + ".tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+def is_fresh(meta):
+    return time.time() - meta.get("fetched_at", 0) < PRICE_TAIL_REFRESH_SECONDS
+
+
+# -----------------------------
+# Incremental Refresh
+# -----------------------------
+def _actions_changed(stored, tail):
+    """
+    True if the new bars imply the stored (adjusted) history is outdated:
+    a dividend or split after the last stored bar, or a re-adjusted close
+    on the bar both frames share.
+    """
+    last = stored.index[-1]
+    new_bars = tail.loc[tail.index > last]
+    for column in _ACTION_COLUMNS:
+        if column in new_bars.columns and (new_bars[column].fillna(0) != 0).any():
+            return True
+
+    if last in tail.index and "Close" in tail.columns:
+        old_close, new_close = stored.at[last, "Close"], tail.at[last, "Close"]
+        if pd.notna(old_close) and pd.notna(new_close):
+            return abs(new_close - old_close) > 1e-6 * max(abs(old_close), 1.0)
+    return False
+
+
+def load_history(symbol, period, interval, fetch):
+    """
+    Returns the stored history of `symbol` covering at least `period`,
+    downloading as little as possible. The window actually covered is
+    recorded in history.attrs["period"]. If the download fails (or comes
+    back empty) and bars are stored, those are returned with
+    history.attrs["stale"] set; without stored bars the error is raised,
+    and an empty download is returned as a stale empty frame that is not
+    saved. `fetch(symbol, interval, period=...,
+    start=...)` performs the actual download.
+    """
+    stored, meta = read(symbol, interval)
+    has_stored = stored is not None and not stored.empty
+
+    if not has_stored or not period_covers(meta.get("period"), period):
+        try:
+            hist = fetch(symbol, interval, period=period)
+        except Exception:
+            if not has_stored:
+                raise
+            # Serve the narrower stored window rather than nothing
+            logger.warning("Price download failed for %s %s; serving stored history", symbol, interval, exc_info=True)
+            stored.attrs["stale"] = True
+            return stored
+        if hist is None or hist.empty:
+            # Nothing to store: an empty file would "cover" the period and
+            # hide the symbol's data until the next refresh
+            if has_stored:
+                stored.attrs["stale"] = True
+                return stored
+            hist = pd.DataFrame() if hist is None else hist
+            hist.attrs.update(period=period, stale=True)
+            return hist
+        save(symbol, interval, period, hist)
+        return hist
+
+    if is_fresh(meta):
+        return stored
+
+    try:
+        hist = _refresh_tail(symbol, interval, meta["period"], stored, fetch)
+    except Exception:
+        # Stale bars beat an empty chart while Yahoo is failing (or the
+        # scheduler's breaker is open); the next request tries again
+        logger.warning("Price refresh failed for %s %s; serving stale history", symbol, interval, exc_info=True)
+        window = slice_period(stored, period)
+        window.attrs["period"] = period
+        window.attrs["stale"] = True
+        return window
+    save(symbol, interval, meta["period"], hist)
+    return hist
+
+
+def _refresh_tail(symbol, interval, stored_period, stored, fetch):
+    """Stored history brought up to date by downloading the bars since its last one."""
+    last = stored.index[-1]
+    tail = fetch(symbol, interval, start=last.date())
+    if tail is None or tail.empty:
+        return stored
+    if _actions_changed(stored, tail):
+        hist = fetch(symbol, interval, period=stored_period)
+        if hist is None or hist.empty:
+            raise ValueError(f"Empty price history for {symbol} {interval}")
+        return hist
+    return pd.concat([stored.loc[stored.index < tail.index[0]], tail])
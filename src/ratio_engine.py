@@ -0,0 +1,118 @@
+# src/ratio_engine.py
+"""
+Financial ratios defined once and evaluated over a (act_symbol, date) panel
+of statement fields for any number of tickers.
+
+Each ratio in `RATIOS` is a sum of signed statement fields divided by one
+field. `evaluate_ratios` turns the registry into a coefficient matrix and
+computes every ratio for every row with a single matrix product, so the
+ratio histories of a hundred tickers cost one pass over the panel.
+
+Missing data is never treated as zero:
+- a missing field in the numerator or denominator gives NaN
+- a zero denominator gives NaN (not 0 or inf)
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# numerator: fields added together ("-field" is subtracted)
+# kind: "percent" for fractions shown as %, "multiple" for plain ratios
+Ratio = namedtuple("Ratio", ["numerator", "denominator", "kind"])
+
+RATIOS = {
+    # Profitability
+    "Net Profit Margin": Ratio(("net_income",), "sales", "percent"),
+    "Gross Margin": Ratio(("sales", "-cost_of_goods"), "sales", "percent"),
+    "ROA": Ratio(("net_income",), "total_assets", "percent"),
+    "ROE": Ratio(("net_income",), "total_equity", "percent"),
+    # Liquidity
+    "Cash Ratio": Ratio(("cash_and_equivalents",), "total_current_liabilities", "multiple"),
+    "Current Ratio": Ratio(("total_current_assets",), "total_current_liabilities", "multiple"),
+    # Solvency
+    "Debt to Equity": Ratio(("total_liabilities",), "total_equity", "percent"),
+    "Debt Ratio": Ratio(("total_liabilities",), "total_assets", "percent"),
+    "Equity Ratio": Ratio(("total_equity",), "total_assets", "percent"),
+    "Interest Coverage": Ratio(("pretax_income",), "interest_expense", "multiple"),
+    # Cash flow
+    "Operating Cash Flow Ratio": Ratio(
+        ("net_cash_from_operating_activities",), "total_current_liabilities", "multiple"
+    ),
+}
+
+
+def _terms(ratio):
+    for term in ratio.numerator:
+        yield (term[1:], -1.0) if term.startswith("-") else (term, 1.0)
+
+
+def ratio_fields(ratios=RATIOS):
+    """Statement fields the given ratios read, in first-use order."""
+    fields = []
+    for ratio in ratios.values():
+        for field, _ in _terms(ratio):
+            fields.append(field)
+        fields.append(ratio.denominator)
+    return list(dict.fromkeys(fields))
+
+
+def ratios_of_kind(kind, ratios=RATIOS):
+    return [name for name, ratio in ratios.items() if ratio.kind == kind]
+
+
+def evaluate_ratios(panel, ratios=RATIOS):
+    """
+    Every ratio for every row of `panel` (statement fields as columns, any
+    index). Fields absent from the panel count as missing. Returns a float
+    frame with the panel's index and one column per ratio.
+    """
+    names = list(ratios)
+    fields = ratio_fields(ratios)
+    values = (
+        panel.reindex(columns=fields)
+        .apply(pd.to_numeric, errors="coerce")
+        .to_numpy(dtype=np.float64)
+    )
+
+    # numerator = values @ coefficients.T; denominators are column picks
+    coefficients = np.zeros((len(names), len(fields)))
+    position = {field: j for j, field in enumerate(fields)}
+    for i, name in enumerate(names):
+        for field, sign in _terms(ratios[name]):
+            coefficients[i, position[field]] += sign
+    denominator_cols = [position[ratios[name].denominator] for name in names]
+
+    missing = np.isnan(values)
+    numerators = np.nan_to_num(values) @ coefficients.T
+    numerators[missing.astype(np.float64) @ (coefficients != 0).T > 0] = np.nan
+    denominators = values[:, denominator_cols]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = numerators / denominators
+    result[denominators == 0] = np.nan
+    return pd.DataFrame(result, index=panel.index, columns=names)
+
+
+def build_ratio_panel(frames):
+    """
+    Stacks per-ticker ratio input frames ({TICKER: DataFrame with a date
+    column}) into one panel indexed by (act_symbol, date), oldest first.
+    """
+    frames = {
+        symbol: df.assign(date=pd.to_datetime(df["date"], errors="coerce")).set_index("date")
+        for symbol, df in frames.items()
+        if isinstance(df, pd.DataFrame) and not df.empty
+    }
+    if not frames:
+        return None
+    panel = pd.concat(frames, names=["act_symbol", "date"])
+    panel = panel[panel.index.get_level_values("date").notna()]
+    return panel.reindex(columns=ratio_fields()).sort_index()
+
+
+@st.cache_resource(max_entries=64)
+def cached_ratios(data_fingerprint, _panel):
+    """Memoized per data fingerprint; the panel itself is not hashed."""
+    return evaluate_ratios(_panel)
@@ -0,0 +1,174 @@
+# src/ticker_index.py
+import bisect
+import os
+import re
+import threading
+from collections import defaultdict, namedtuple
+
+import streamlit as st
+
+from src.info_cache import get_info_cache
+
+TICKER_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "all_tickers.txt")
+
+TickerMatch = namedtuple("TickerMatch", ["symbol", "name"])
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class TickerIndex:
+    """
+    In-memory typeahead index over ticker symbols and company names.
+
+    all_tickers.txt lists bare US symbols only. Company names and
+    exchange-suffixed symbols come from the company info cache
+    (src.info_cache), so name and suffix search only find companies whose
+    info has been loaded at least once.
+
+    Lookups go through sorted arrays (bisect prefix ranges) and a
+    one-deletion typo table, so a search never scans the full list.
+    Exchange-suffixed tickers (e.g. 2330.TW) are also found by their base
+    symbol, and names by any word prefix ("semi" -> "Taiwan Semiconductor").
+    """
+
+    def __init__(self, entries=()):
+        self.names = {}
+        for symbol, name in entries:
+            symbol = symbol.upper()
+            # A named entry (e.g. from the info cache) wins over a bare one
+            if name or symbol not in self.names:
+                self.names[symbol] = name or ""
+
+        self._symbols = sorted(self.names)
+        self._bases = sorted(
+            (symbol.split(".", 1)[0], symbol) for symbol in self._symbols if "." in symbol
+        )
+        self._words = sorted(
+            (word, symbol)
+            for symbol, name in self.names.items()
+            for word in set(_WORD_RE.findall(name.lower()))
+        )
+        self._deletes = defaultdict(set)
+        for symbol in self._symbols:
+            for variant in _deletions(symbol):
+                self._deletes[variant].add(symbol)
+        self._lock = threading.Lock()
+
+    def add(self, symbol, name=""):
+        """
+        Adds a symbol, or gives a known symbol its company name, whenever
+        company info for a ticker is loaded.
+        """
+        symbol = symbol.upper()
+        name = name or ""
+        with self._lock:
+            known = symbol in self.names
+            if known and (self.names[symbol] or not name):
+                return
+            self.names[symbol] = name
+            for word in set(_WORD_RE.findall(name.lower())):
+                bisect.insort(self._words, (word, symbol))
+            if known:
+                return
+            bisect.insort(self._symbols, symbol)
+            if "." in symbol:
+                bisect.insort(self._bases, (symbol.split(".", 1)[0], symbol))
+            for variant in _deletions(symbol):
+                self._deletes[variant].add(symbol)
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __contains__(self, symbol):
+        return symbol.upper() in self.names
+
+    def search(self, query, limit=10):
+        """
+        Returns up to `limit` TickerMatch results, best first: exact symbol,
+        symbol prefix, base symbol of suffixed tickers, company-name word
+        prefix, then symbols one typo away.
+        """
+        query = query.strip()
+        if not query:
+            return []
+        upper = query.upper()
+
+        found = {}
+
+        def add(symbols):
+            for symbol in symbols:
+                if len(found) >= limit:
+                    return
+                found.setdefault(symbol, None)
+
+        if upper in self.names:
+            add([upper])
+        add(_prefix_range(self._symbols, upper, limit))
+        add(symbol for _, symbol in _prefix_range(self._bases, (upper,), limit, key=0))
+        for term in _WORD_RE.findall(query.lower()):
+            add(symbol for _, symbol in _prefix_range(self._words, (term,), limit, key=0))
+        if len(found) < limit:
+            typo_matches = set(self._deletes.get(upper, ()))
+            for variant in _deletions(upper):
+                if variant in self.names:
+                    typo_matches.add(variant)
+                typo_matches.update(self._deletes.get(variant, ()))
+            add(sorted(typo_matches, key=lambda s: (abs(len(s) - len(upper)), s)))
+
+        return [TickerMatch(symbol, self.names[symbol]) for symbol in found]
+
+
+def _deletions(text):
+    return {text[:i] + text[i + 1:] for i in range(len(text))} if len(text) > 1 else set()
+
+
+def _prefix_range(sorted_items, prefix, limit, key=None):
+    """Returns up to `limit` items of a sorted list that start with `prefix`."""
+    start = bisect.bisect_left(sorted_items, prefix)
+    items = []
+    for item in sorted_items[start:start + limit]:
+        value = item if key is None else item[key]
+        if not value.startswith(prefix if key is None else prefix[key]):
+            break
+        items.append(item)
+    return items
+
+
+def read_ticker_file(path=TICKER_FILE):
+    """
+    Reads one ticker per line. A company name may follow the symbol after a
+    tab or comma ("AAPL,Apple Inc."). Returns [(symbol, name)].
+    """
+    entries = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                symbol, name = _split_line(line)
+                entries.append((symbol, name))
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def _split_line(line):
+    for sep in ("\t", ","):
+        if sep in line:
+            symbol, name = line.split(sep, 1)
+            return symbol.strip(), name.strip()
+    return line, ""
+
+
+@st.cache_resource
+def get_ticker_index(path=TICKER_FILE):
+    """
+    Builds the index once per process from the ticker file plus every
+    company in the info cache (names, and non-US symbols like 2330.TW).
+    """
+    return TickerIndex(read_ticker_file(path) + get_info_cache().names())
+
+
+def search_tickers(query, limit=10):
+    return get_ticker_index().search(query, limit)
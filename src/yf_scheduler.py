@@ -0,0 +1,178 @@
+# src/yf_scheduler.py
+"""
+Process-wide scheduler for Yahoo Finance requests.
+
+Every yfinance call in the app goes through `YahooScheduler.call(key, fn)`:
+
+- single-flight: concurrent calls with the same key share one request
+- a token bucket caps the request rate across all sessions
+- failed requests are retried with exponential backoff and full jitter;
+  an empty result counts as a failure, since yfinance reports most errors
+  (throttling included) by returning an empty frame
+- consecutive failures open a circuit breaker; while it is open, calls
+  return the last good result for their key instead of hitting Yahoo
+"""
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+import streamlit as st
+
+YF_RATE_PER_SECOND = float(os.getenv("YF_RATE_PER_SECOND", "2"))
+YF_BURST = int(os.getenv("YF_BURST", "5"))
+YF_RETRIES = int(os.getenv("YF_RETRIES", "3"))
+YF_BACKOFF_SECONDS = float(os.getenv("YF_BACKOFF_SECONDS", "0.5"))
+YF_BREAKER_THRESHOLD = int(os.getenv("YF_BREAKER_THRESHOLD", "5"))
+YF_BREAKER_COOLDOWN = float(os.getenv("YF_BREAKER_COOLDOWN", "60"))
+YF_LAST_GOOD_ENTRIES = int(os.getenv("YF_LAST_GOOD_ENTRIES", "1024"))
+
+
+class YahooUnavailable(RuntimeError):
+    """Raised when the circuit breaker is open and no earlier result exists."""
+
+
+class EmptyResult(RuntimeError):
+    """Raised when Yahoo keeps returning no data for a request."""
+
+
+def _is_empty(result):
+    return result is None or (isinstance(result, (pd.DataFrame, pd.Series, dict)) and len(result) == 0)
+
+
+def _copy(result):
+    """Callers get their own copy, so mutating it cannot touch shared results."""
+    return result.copy() if isinstance(result, (pd.DataFrame, pd.Series, dict)) else result
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class YahooScheduler:
+    def __init__(
+        self,
+        rate=YF_RATE_PER_SECOND,
+        burst=YF_BURST,
+        retries=YF_RETRIES,
+        backoff=YF_BACKOFF_SECONDS,
+        breaker_threshold=YF_BREAKER_THRESHOLD,
+        breaker_cooldown=YF_BREAKER_COOLDOWN,
+        last_good_entries=YF_LAST_GOOD_ENTRIES,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.last_good_entries = last_good_entries
+
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._last_good = OrderedDict()
+        self._failures = 0
+        self._open_until = 0.0
+
+    # -----------------------------
+    # Circuit Breaker
+    # -----------------------------
+    def breaker_open(self):
+        with self._lock:
+            return time.monotonic() < self._open_until
+
+    def _record_success(self, key, result):
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+            self._last_good[key] = _copy(result)
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > self.last_good_entries:
+                self._last_good.popitem(last=False)
+
+    def _record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.breaker_threshold:
+                self._open_until = time.monotonic() + self.breaker_cooldown
+
+    def _fallback(self, key, error):
+        with self._lock:
+            if key in self._last_good:
+                return _copy(self._last_good[key])
+        raise error
+
+    # -----------------------------
+    # Calls
+    # -----------------------------
+    def _run(self, key, fn, args, kwargs):
+        if self.breaker_open():
+            return self._fallback(key, YahooUnavailable("Yahoo Finance requests are paused after repeated failures"))
+
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                result = fn(*args, **kwargs)
+                if _is_empty(result):
+                    raise EmptyResult(f"Yahoo Finance returned no data for {key!r}")
+            except Exception as e:
+                error = e
+                if attempt < self.retries:
+                    time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+                continue
+            self._record_success(key, result)
+            return result
+
+        self._record_failure()
+        return self._fallback(key, error)
+
+    def call(self, key, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) under the scheduler. `key` identifies the
+        request (e.g. ("history", "AAPL", "1d", "5y")); callers that arrive
+        while the same key is in flight wait for that result instead.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+
+        # Every caller (leader and waiters) gets its own copy of the result
+        if not leader:
+            return _copy(future.result())
+
+        try:
+            future.set_result(self._run(key, fn, args, kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return _copy(future.result())
+
+
+@st.cache_resource
+def get_yf_scheduler():
+    """One scheduler per process, shared by every session."""
+    return YahooScheduler()
@@ -9,9 +9,6 @@ def render_ai_news_component():
     """
     st.subheader("☀️ Daily Market Briefing")
 
-    # 1. Initialize Client (Logic from src)
-    client = get_gemini_client()
-
     # 2. UI: Input Section
     # We use an expander so it doesn't clutter the dashboard
     with st.expander("⚙️ Configure News Sources & Topic", expanded=True):
@@ -32,6 +29,8 @@ def render_ai_news_component():
             submitted = st.form_submit_button("Generate Briefing")
 
     # 3. Logic: Handle Submission
+    # The client (and google-genai) is only created once a briefing is requested
+    client = get_gemini_client() if submitted else None
     if submitted and client:
         urls_to_scrape = [u.strip() for u in url_input.split('\n') if u.strip()]
         if urls_to_scrape:
@@ -3,6 +3,20 @@ import plotly.express as px
 from urllib.parse import urlparse
 # Import all necessary functions, including the new synthesis one
 from src.economic_utils import get_macro_data, synthesize_indicator_conclusion 
+from src.figure_cache import cached_figure, fingerprint
+
+def _indicator_figure(df, label, unit, years):
+    fig = px.line(df, x='Date', y='Value', title=f"{label} (Last {years} Years)")
+    y_axis_title = f"{label} ({unit})"
+    
+    fig.update_layout(
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=400, 
+        xaxis_title=None,
+        yaxis_title=y_axis_title,
+        template="plotly_white" 
+    )
+    return fig
 
 def render_macro_economic_section():
     st.markdown("### 🏦 Macroeconomic Indicators (FRED Data)")
@@ -99,15 +113,10 @@ def render_macro_economic_section():
     df = get_macro_data(series_id, label, years=years) 
     
     if df is not None:
-        fig = px.line(df, x='Date', y='Value', title=f"{label} (Last {years} Years)")
-        y_axis_title = f"{label} ({unit})"
-        
-        fig.update_layout(
-            margin=dict(l=20, r=20, t=40, b=20),
-            height=400, 
-            xaxis_title=None,
-            yaxis_title=y_axis_title,
-            template="plotly_white" 
+        # Reruns from the AI focus box or other widgets reuse the built figure
+        fig = cached_figure(
+            ("macro", fingerprint(df), label, unit, years, "plotly_white"),
+            lambda: _indicator_figure(df, label, unit, years),
         )
         st.plotly_chart(fig, use_container_width=True)
 